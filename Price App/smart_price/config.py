@@ -30,6 +30,7 @@ _DEFAULT_OUTPUT_EXCEL = _DEFAULT_OUTPUT_DIR / "merged_prices.xlsx"
 _DEFAULT_OUTPUT_DB = _DEFAULT_OUTPUT_DIR / "fiyat_listesi.db"
 _DEFAULT_OUTPUT_LOG = _DEFAULT_OUTPUT_DIR / "source_log.csv"
 _DEFAULT_LOG_PATH = _REPO_ROOT / "smart_price.log"
+_DEFAULT_CACHE_DIR = Path.home() / ".cache" / "smart_price"
 _DEFAULT_EXTRACTION_GUIDE = _REPO_ROOT / "extraction_guide.md"
 _DEFAULT_TESSERACT_CMD = Path(r"D:\\Program Files\\Tesseract-OCR\\tesseract.exe")
 _DEFAULT_TESSDATA_PREFIX = Path(r"D:\\Program Files\\Tesseract-OCR\\tessdata")
@@ -65,6 +66,7 @@ OUTPUT_EXCEL: Path = _DEFAULT_OUTPUT_EXCEL
 OUTPUT_DB: Path = _DEFAULT_OUTPUT_DB
 OUTPUT_LOG: Path = _DEFAULT_OUTPUT_LOG
 LOG_PATH: Path = _DEFAULT_LOG_PATH
+CACHE_DIR: Path = _DEFAULT_CACHE_DIR
 TESSERACT_CMD: Path = _DEFAULT_TESSERACT_CMD
 TESSDATA_PREFIX: Path = _DEFAULT_TESSDATA_PREFIX
 POPPLER_PATH: Path = _DEFAULT_POPPLER_PATH
@@ -93,6 +95,7 @@ __all__ = [
     "OUTPUT_DB",
     "OUTPUT_LOG",
     "LOG_PATH",
+    "CACHE_DIR",
     "TESSERACT_CMD",
     "TESSDATA_PREFIX",
     "POPPLER_PATH",
@@ -145,6 +148,7 @@ def load_config() -> None:
 
     global MASTER_EXCEL_PATH, MASTER_DB_PATH, IMAGE_DIR, SALES_APP_DIR, PRICE_APP_DIR
     global DEBUG_DIR, TEXT_DEBUG_DIR, OUTPUT_DIR, OUTPUT_EXCEL, OUTPUT_DB, OUTPUT_LOG, LOG_PATH
+    global CACHE_DIR
     global TESSERACT_CMD, TESSDATA_PREFIX, POPPLER_PATH, BASE_REPO_URL, DEFAULT_DB_URL
     global DEFAULT_IMAGE_BASE_URL, LOGO_TOP, LOGO_RIGHT, LOGO_OPACITY, EXTRACTION_GUIDE_PATH
     global VISION_AGENT_API_KEY, MAX_RETRIES, MAX_RETRY_WAIT_TIME, RETRY_DELAY_BASE
@@ -162,6 +166,7 @@ def load_config() -> None:
     OUTPUT_DB = _get("OUTPUT_DB", OUTPUT_DIR / "fiyat_listesi.db")
     OUTPUT_LOG = _get("OUTPUT_LOG", OUTPUT_DIR / "source_log.csv")
     LOG_PATH = _get("LOG_PATH", _DEFAULT_LOG_PATH)
+    CACHE_DIR = _get("CACHE_DIR", _DEFAULT_CACHE_DIR)
     TESSERACT_CMD = _get("TESSERACT_CMD", _DEFAULT_TESSERACT_CMD)
     TESSDATA_PREFIX = _get("TESSDATA_PREFIX", _DEFAULT_TESSDATA_PREFIX)
     POPPLER_PATH = _get("POPPLER_PATH", _DEFAULT_POPPLER_PATH)
@@ -1,11 +1,48 @@
+import atexit
 import os
 import re
+import shutil
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Any, NamedTuple, Optional
 import logging
 
+try:  # pragma: no cover - numpy ships with pandas
+    import numpy as np
+except ImportError:  # pragma: no cover - pandas features unavailable
+    np = None
+
+try:  # pragma: no cover - optional speedup
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - fall back to the stdlib parser
+    _orjson = None
+
 logger = logging.getLogger("smart_price")
 
+_DOTENV_FLAG = "_SMART_PRICE_DOTENV_LOADED"
+
+
+def load_env_once() -> None:
+    """Load the nearest ``.env`` file into :data:`os.environ` once.
+
+    ``find_dotenv`` walks up the directory tree, so the result is recorded
+    in the environment and later imports or module reloads skip the lookup.
+    """
+    if os.environ.get(_DOTENV_FLAG):
+        return
+    try:
+        from dotenv import load_dotenv
+    except ImportError:  # pragma: no cover - optional dependency
+        return
+    try:
+        from dotenv import find_dotenv
+    except ImportError:  # pragma: no cover - support missing find_dotenv
+        dotenv_path = ""
+    else:
+        dotenv_path = find_dotenv()
+    load_dotenv(dotenv_path=dotenv_path)
+    os.environ[_DOTENV_FLAG] = "1"
+
 
 def normalize_price(price_str: Optional[str], *, style: str = "eu") -> Optional[float]:
     """Convert a raw price string to a float value.
@@ -54,6 +91,176 @@ def normalize_price(price_str: Optional[str], *, style: str = "eu") -> Optional[
         return None
 
 
+def _parse_price_buffer(buf, starts, ends, eu):
+    """Parse NUL separated price strings stored in ``buf``.
+
+    Kernel used by :func:`normalize_price_series` when Numba is enabled. It
+    mirrors :func:`normalize_price` for ASCII input and flags everything it
+    cannot reproduce exactly (non-ASCII text, more than 15 significant
+    digits) with status ``2`` so the caller can fall back to Python.
+    """
+    n = starts.shape[0]
+    out = np.empty(n, np.float64)
+    status = np.zeros(n, np.int8)
+    for i in range(n):
+        out[i] = np.nan
+        start = starts[i]
+        end = ends[i]
+        last_comma = -1
+        last_dot = -1
+        for j in range(start, end):
+            c = buf[j]
+            if c >= 128:
+                status[i] = 2
+                break
+            if c == 44:
+                last_comma = j
+            elif c == 46:
+                last_dot = j
+        if status[i] == 2:
+            continue
+
+        dec = 46
+        drop = 0
+        if eu:
+            if last_comma >= 0 and last_dot >= 0:
+                if last_dot > last_comma:
+                    status[i] = 1
+                    continue
+                dec = 44
+                drop = 46
+            elif last_comma >= 0:
+                dec = 44
+        else:
+            if last_comma >= 0 and last_dot >= 0:
+                if last_comma < last_dot:
+                    drop = 44
+                else:
+                    dec = 44
+                    drop = 46
+            elif last_comma >= 0:
+                drop = 44
+
+        mant = 0
+        digits = 0
+        significant = 0
+        frac = 0
+        seen_dec = False
+        for j in range(start, end):
+            c = buf[j]
+            if 48 <= c <= 57:
+                digits += 1
+                if mant > 0 or c != 48:
+                    significant += 1
+                mant = mant * 10 + (c - 48)
+                if seen_dec:
+                    frac += 1
+                if significant > 15 or frac > 22:
+                    status[i] = 2
+                    break
+            elif c == dec:
+                if seen_dec:
+                    status[i] = 1
+                    break
+                seen_dec = True
+            elif c == drop:
+                continue
+            elif c == 44 or c == 46:
+                status[i] = 1
+                break
+        if status[i] != 0:
+            continue
+        if digits == 0:
+            status[i] = 1
+            continue
+        out[i] = mant / 10.0**frac
+    return out, status
+
+
+def _apply_unique(series, func):
+    """Return ``series.map(func)`` evaluating ``func`` once per distinct value.
+
+    Missing values map to ``None``. Price and currency columns repeat the
+    same few strings across many rows, so this avoids most Python calls.
+    """
+    import pandas as pd
+
+    try:
+        codes, uniques = pd.factorize(series)
+    except TypeError:  # unhashable cells
+        return series.map(func)
+    mapped = np.array([func(v) for v in uniques] + [None], dtype=object)
+    return pd.Series(mapped[codes], index=series.index, name=series.name)
+
+
+_NUMBA_KERNEL = None
+
+
+def _numba_price_kernel():
+    """Return the compiled price kernel or ``None`` if Numba is missing."""
+    global _NUMBA_KERNEL
+    if _NUMBA_KERNEL is None:
+        try:
+            from numba import njit
+        except Exception:  # pragma: no cover - optional dependency missing
+            logger.warning("SMART_PRICE_NUMBA set but numba is not installed")
+            _NUMBA_KERNEL = False
+        else:
+            _NUMBA_KERNEL = njit(cache=True)(_parse_price_buffer)
+    return _NUMBA_KERNEL or None
+
+
+def normalize_price_series(values, *, style: str = "eu"):
+    """Apply :func:`normalize_price` to every element of ``values``.
+
+    When ``SMART_PRICE_NUMBA=1`` and Numba is installed the strings are
+    parsed by a compiled kernel; inputs it cannot handle exactly fall back
+    to :func:`normalize_price`. Otherwise :func:`normalize_price` runs once
+    per distinct value, which gives the same result as
+    ``values.apply(normalize_price)``.
+
+    Parameters
+    ----------
+    values : pandas.Series or sequence
+        Raw price values.
+    style : {'eu', 'en'}, optional
+        Number style passed to :func:`normalize_price`.
+
+    Returns
+    -------
+    pandas.Series
+        Parsed prices with missing values for unparsable entries.
+    """
+    import pandas as pd
+
+    if style not in {"eu", "en"}:
+        raise ValueError("style must be 'eu' or 'en'")
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+
+    kernel = None
+    if os.getenv("SMART_PRICE_NUMBA") == "1" and len(series):
+        kernel = _numba_price_kernel()
+    if kernel is None:
+        return _apply_unique(
+            series, lambda v: normalize_price(v, style=style)
+        ).astype("float64")
+
+    texts = ["" if v is None else str(v) for v in series.tolist()]
+    joined = "\x00".join(texts)
+    if joined.count("\x00") != len(texts) - 1:
+        return series.apply(normalize_price, style=style)
+    buf = np.frombuffer(joined.encode("utf-8"), dtype=np.uint8)
+    seps = np.flatnonzero(buf == 0)
+    starts = np.concatenate(([0], seps + 1)).astype(np.int64)
+    ends = np.concatenate((seps, [len(buf)])).astype(np.int64)
+
+    out, status = kernel(buf, starts, ends, style == "eu")
+    for idx in np.flatnonzero(status == 2):
+        val = normalize_price(texts[idx], style=style)
+        out[idx] = np.nan if val is None else val
+    return pd.Series(out, index=series.index, name=series.name)
+
+
 def detect_currency(text: str) -> Optional[str]:
     """Try to guess the currency from a text snippet."""
     if not text:
@@ -68,6 +275,38 @@ def detect_currency(text: str) -> Optional[str]:
     return None
 
 
+# Every value :func:`normalize_currency` can return.
+CURRENCY_SYMBOLS = ("₺", "$", "€")
+
+
+def detect_currency_series(values):
+    """Apply :func:`detect_currency` to a Series of text snippets.
+
+    Missing values yield ``None``; every distinct snippet is inspected once.
+    """
+    import pandas as pd
+
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    return _apply_unique(series, detect_currency)
+
+
+def normalize_currency_series(values):
+    """Apply :func:`normalize_currency` to a Series of currency labels.
+
+    Missing values yield ``None``; every distinct label is mapped once.
+    Categorical input whose categories are already :data:`CURRENCY_SYMBOLS`
+    is returned unchanged.
+    """
+    import pandas as pd
+
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if isinstance(series.dtype, pd.CategoricalDtype) and set(
+        series.cat.categories
+    ) <= set(CURRENCY_SYMBOLS):
+        return series
+    return _apply_unique(series, normalize_currency)
+
+
 def normalize_currency(value: Optional[str]) -> Optional[str]:
     """Return a single currency symbol for ``value``."""
     if not value:
@@ -228,10 +467,10 @@ def gpt_clean_text(text: str) -> str:
 def safe_json_parse(text: str):
     """Best-effort JSON parser.
 
-    Attempts ``json.loads`` first and then tries common fixes such as
-    replacing single quotes with double quotes or quoting bare keys.  As a
-    last resort ``ast.literal_eval`` is used.  ``None`` is returned if all
-    attempts fail.
+    Attempts ``orjson.loads`` (when installed) and ``json.loads`` first and
+    then tries common fixes such as replacing single quotes with double
+    quotes or quoting bare keys.  As a last resort ``ast.literal_eval`` is
+    used.  ``None`` is returned if all attempts fail.
     """
 
     import json
@@ -243,6 +482,14 @@ def safe_json_parse(text: str):
     def _validate(obj):
         return obj if isinstance(obj, (list, dict)) else None
 
+    if _orjson is not None:
+        try:
+            result = _orjson.loads(text)
+            if _validate(result) is not None:
+                return result
+        except Exception:
+            pass
+
     try:
         result = json.loads(text)
         if _validate(result) is not None:
@@ -309,6 +556,71 @@ def log_metric(
         )
 
 
+def file_to_base64(path: str | Path) -> str:
+    """Return the base64 encoded contents of the file at ``path``.
+
+    The file is memory-mapped and encoded straight from the mapping, so the
+    raw bytes are never copied into a separate buffer.
+    """
+    import base64
+    import mmap
+
+    with open(path, "rb") as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            return ""
+        with mm:
+            return base64.b64encode(mm).decode("ascii")
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as exc:  # pragma: no cover - cleanup errors
+        logger.error("temp file cleanup failed: %s", exc)
+
+
+# Spooled files not yet removed by their caller, deleted at interpreter exit.
+_SPOOLED: set[str] = set()
+
+
+def _remove_spooled() -> None:
+    for path in list(_SPOOLED):
+        _remove_quietly(path)
+    _SPOOLED.clear()
+
+
+atexit.register(_remove_spooled)
+
+
+def spool_to_tempfile(fileobj, suffix: str = "") -> str:
+    """Copy ``fileobj`` into a named temporary file and return its path.
+
+    The data is streamed in 1 MiB chunks so large uploads are never held
+    in memory twice. Callers should delete the file with
+    :func:`remove_tempfile` when done; anything left over is deleted at
+    interpreter exit.
+    """
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, buffering=1 << 20)
+    try:
+        with tmp:
+            shutil.copyfileobj(fileobj, tmp, length=1 << 20)
+    except BaseException:
+        _remove_quietly(tmp.name)
+        raise
+    _SPOOLED.add(tmp.name)
+    return tmp.name
+
+
+def remove_tempfile(path: str) -> None:
+    """Delete a file created by :func:`spool_to_tempfile`."""
+    _SPOOLED.discard(path)
+    _remove_quietly(path)
+
+
 EXTRACTION_FIELDS = [
     "Malzeme_Kodu",
     "Açıklama",
@@ -325,6 +637,44 @@ EXTRACTION_FIELDS = [
 ]
 
 
+class ExtractResult(NamedTuple):
+    """Extracted rows together with the per-page summary and token usage.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        Extracted rows.
+    page_summary : list of dict
+        One entry per processed page.
+    token_counts : dict
+        ``{"input": int, "output": int}`` LLM token usage.
+    """
+
+    df: Any
+    page_summary: list
+    token_counts: dict
+
+    @classmethod
+    def from_frame(cls, df) -> "ExtractResult":
+        """Wrap ``df`` reading the legacy ``page_summary``/``token_counts``."""
+        return cls(
+            df,
+            getattr(df, "page_summary", None) or [],
+            getattr(df, "token_counts", None) or {},
+        )
+
+    def to_frame(self):
+        """Return ``df`` with the metadata attached as attributes.
+
+        Kept for callers that read ``df.page_summary`` and
+        ``df.token_counts``.
+        """
+        if hasattr(self.df, "__dict__"):
+            object.__setattr__(self.df, "page_summary", self.page_summary)
+            object.__setattr__(self.df, "token_counts", self.token_counts)
+        return self.df
+
+
 def validate_output_df(df):
     """Return ``df`` cleaned according to ``EXTRACTION_FIELDS``."""
     import pandas as pd
@@ -375,11 +725,11 @@ def validate_output_df(df):
         logger.warning("[debug] validate_output_df logging failed: %s", exc)
 
     if "Fiyat" in result.columns:
-        result["Fiyat"] = result["Fiyat"].apply(normalize_price)
+        result["Fiyat"] = normalize_price_series(result["Fiyat"])
 
     if "Para_Birimi" not in result.columns:
         result["Para_Birimi"] = None
-    result["Para_Birimi"] = result["Para_Birimi"].apply(normalize_currency)
+    result["Para_Birimi"] = normalize_currency_series(result["Para_Birimi"])
     result["Para_Birimi"] = result["Para_Birimi"].fillna("₺")
 
     for col in EXTRACTION_FIELDS:
@@ -10,6 +10,11 @@ logger = logging.getLogger("smart_price")
 _subdir: Optional[str] = None
 
 
+def debug_enabled() -> bool:
+    """Return ``True`` unless ``SMART_PRICE_DEBUG`` is set to something other than ``1``."""
+    return os.getenv("SMART_PRICE_DEBUG", "1") == "1"
+
+
 def set_output_subdir(name: Optional[str]) -> None:
     """Set the folder name under ``LLM_Output_db`` used for new files."""
     global _subdir
@@ -37,6 +42,8 @@ def _text_debug_dir() -> Path:
 
 
 def save_debug(prefix: str, page: int, content: str) -> None:
+    if not debug_enabled():
+        return
     dir_path = _text_debug_dir()
     file_path = dir_path / f"{prefix}_page_{page:02d}.txt"
     try:
@@ -62,7 +69,10 @@ def save_debug_image(prefix: str, page: int, image: Image.Image) -> Optional[Pat
     -------
     pathlib.Path or None
         Path of the saved image if it could be written, otherwise ``None``.
+        Nothing is encoded when debugging is disabled.
     """
+    if not debug_enabled():
+        return None
     dir_path = _debug_dir()
     file_path = dir_path / f"{prefix}_page_{page:02d}.jpg"
     try:
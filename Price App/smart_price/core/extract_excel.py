@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import os
 import re
 import unicodedata
@@ -10,18 +11,22 @@ import logging
 from datetime import datetime
 from pathlib import Path
 from .common_utils import (
-    normalize_price,
+    normalize_price_series,
     select_latest_year_column,
-    detect_currency,
+    detect_currency_series,
     detect_brand,
-    normalize_currency,
+    normalize_currency_series,
 )
 
 logger = logging.getLogger("smart_price")
 
 
+@functools.lru_cache(maxsize=4096)
 def _norm_header(text: str) -> str:
-    """Normalize a header string for fuzzy matching."""
+    """Normalize a header string for fuzzy matching.
+
+    Results are cached since the same headers recur across files.
+    """
     text = str(text).replace("_", " ")
     text = unicodedata.normalize("NFKD", text)
     text = text.encode("ascii", "ignore").decode("ascii")
@@ -60,9 +65,9 @@ _RAW_DESC_HEADERS = [
     "explanation",
 ]
 
-POSSIBLE_CODE_HEADERS = set(_RAW_CODE_HEADERS)
-_NORMALIZED_CODE_HEADERS = [_norm_header(h) for h in POSSIBLE_CODE_HEADERS]
-POSSIBLE_DESC_HEADERS = [_norm_header(h) for h in _RAW_DESC_HEADERS]
+POSSIBLE_CODE_HEADERS = tuple(dict.fromkeys(_RAW_CODE_HEADERS))
+_NORMALIZED_CODE_HEADERS = tuple(_norm_header(h) for h in POSSIBLE_CODE_HEADERS)
+POSSIBLE_DESC_HEADERS = tuple(_norm_header(h) for h in _RAW_DESC_HEADERS)
 
 # Short code headers
 _RAW_SHORT_HEADERS = [
@@ -72,11 +77,11 @@ _RAW_SHORT_HEADERS = [
     'shortcode',
     'kısa ürün kodu',
 ]
-POSSIBLE_SHORT_HEADERS = [_norm_header(h) for h in _RAW_SHORT_HEADERS]
+POSSIBLE_SHORT_HEADERS = tuple(_norm_header(h) for h in _RAW_SHORT_HEADERS)
 
 # Combined list used by the PDF extractor
 POSSIBLE_PRODUCT_NAME_HEADERS = (
-    list(_NORMALIZED_CODE_HEADERS) + POSSIBLE_SHORT_HEADERS + POSSIBLE_DESC_HEADERS
+    _NORMALIZED_CODE_HEADERS + POSSIBLE_SHORT_HEADERS + POSSIBLE_DESC_HEADERS
 )
 _RAW_PRICE_HEADERS = [
     'fiyat', 'birim fiyat', 'liste fiyatı', 'price', 'unit price', 'list price',
@@ -84,25 +89,24 @@ _RAW_PRICE_HEADERS = [
 ]
 _RAW_CURRENCY_HEADERS = ['para birimi', 'currency']
 
-POSSIBLE_PRICE_HEADERS = [_norm_header(h) for h in _RAW_PRICE_HEADERS]
-POSSIBLE_CURRENCY_HEADERS = [_norm_header(h) for h in _RAW_CURRENCY_HEADERS]
+POSSIBLE_PRICE_HEADERS = tuple(_norm_header(h) for h in _RAW_PRICE_HEADERS)
+POSSIBLE_CURRENCY_HEADERS = tuple(_norm_header(h) for h in _RAW_CURRENCY_HEADERS)
 
 # Headers for main and sub titles
 _RAW_MAIN_HEADERS = ["ana başlık", "ana baslik", "ana_baslik"]
 _RAW_SUB_HEADERS = ["alt başlık", "alt baslik", "alt_baslik"]
-POSSIBLE_MAIN_HEADERS = [_norm_header(h) for h in _RAW_MAIN_HEADERS]
-POSSIBLE_SUB_HEADERS = [_norm_header(h) for h in _RAW_SUB_HEADERS]
+POSSIBLE_MAIN_HEADERS = tuple(_norm_header(h) for h in _RAW_MAIN_HEADERS)
+POSSIBLE_SUB_HEADERS = tuple(_norm_header(h) for h in _RAW_SUB_HEADERS)
 
 
 def _map_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Rename common columns for code, description and price."""
-    norm = [_norm_header(c) for c in df.columns]
+    norm_map: dict[str, Any] = {}
+    for col in df.columns:
+        norm_map.setdefault(_norm_header(col), col)
 
     def pick(cands):
-        for h in cands:
-            if h in norm:
-                return df.columns[norm.index(h)]
-        return None
+        return next((norm_map[h] for h in cands if h in norm_map), None)
 
     rename = {
         pick(POSSIBLE_CODE_HEADERS): "Malzeme_Kodu",
@@ -257,8 +261,12 @@ def extract_from_excel(
                     mapping[sub_col] = "Alt_Baslik"
                 sheet_data.rename(columns=mapping, inplace=True)
                 if "Para_Birimi" not in sheet_data.columns:
-                    sheet_data["Para_Birimi"] = sheet_data["Fiyat_Ham"].astype(str).apply(detect_currency)
-                sheet_data["Para_Birimi"] = sheet_data["Para_Birimi"].apply(normalize_currency)
+                    sheet_data["Para_Birimi"] = detect_currency_series(
+                        sheet_data["Fiyat_Ham"].astype(str)
+                    )
+                sheet_data["Para_Birimi"] = normalize_currency_series(
+                    sheet_data["Para_Birimi"]
+                )
                 sheet_data["Para_Birimi"] = sheet_data["Para_Birimi"].fillna("₺")
                 sheet_data["Kaynak_Dosya"] = _basename(filepath, filename)
                 brand_from_file = detect_brand(_basename(filepath, filename))
@@ -284,7 +292,7 @@ def extract_from_excel(
         return pd.DataFrame()
     combined = pd.concat(all_data, ignore_index=True)
     logger.debug("[%s] DataFrame oluşturuldu: %d satır", src, len(combined))
-    combined["Fiyat"] = combined["Fiyat_Ham"].apply(normalize_price)
+    combined["Fiyat"] = normalize_price_series(combined["Fiyat_Ham"])
     if "Malzeme_Kodu" in combined.columns:
         try:
             combined["Malzeme_Kodu"] = combined["Malzeme_Kodu"].astype("string")
@@ -1,44 +1,40 @@
 from __future__ import annotations
 
+import atexit
 import os
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import IO, Any, Optional, Sequence, Callable, Iterable
 import logging
 from datetime import datetime
 import difflib
+import functools
 import unicodedata
 
 import pandas as pd
 
-try:
-    from dotenv import load_dotenv, find_dotenv
-except ImportError:  # pragma: no cover - support missing find_dotenv
-    from dotenv import load_dotenv
-
-    def find_dotenv() -> str:
-        return ""
-
-
-try:
-    load_dotenv(dotenv_path=find_dotenv())
-except TypeError:  # pragma: no cover - allow stub without args
-    load_dotenv(dotenv_path=find_dotenv())
-
 # Optional OCR dependencies are imported lazily within extract_from_pdf
 import re
 from .common_utils import (
-    normalize_price,
-    detect_currency,
-    normalize_currency,
+    normalize_currency_series,
+    normalize_price_series,
+    detect_currency_series,
     detect_brand,
     gpt_clean_text,
     safe_json_parse,
     validate_output_df,
+    ExtractResult,
+    CURRENCY_SYMBOLS,
+    spool_to_tempfile,
+    remove_tempfile,
+    load_env_once,
 )
+
+load_env_once()
+
 import time
 from . import ocr_llm_fallback
 from pathlib import Path
-from .debug_utils import save_debug, set_output_subdir
+from .debug_utils import debug_enabled, save_debug, set_output_subdir
 from .prompt_utils import prompts_for_pdf
 from .token_utils import log_token_counts
 from .github_upload import upload_folder, _sanitize_repo_path
@@ -56,14 +52,23 @@ logger = logging.getLogger("smart_price")
 
 def _norm(s: Any) -> str:
     """Normalize ``s`` for fuzzy header matching."""
-    return unicodedata.normalize("NFKD", str(s)).lower()
+    text = str(s)
+    if text.isascii():  # NFKD leaves ASCII untouched
+        return text.lower()
+    return unicodedata.normalize("NFKD", text).lower()
+
+
+@functools.lru_cache(maxsize=128)
+def _norm_candidates(candidates: tuple[str, ...]) -> list[str]:
+    """Return normalized ``candidates``; cached per candidate tuple."""
+    return [_norm(c) for c in candidates]
 
 
 def header_match(
     cell: Any, candidates: Sequence[str], *, match_type: str | None = None
 ) -> bool:
     """Return True if ``cell`` fuzzily matches any of ``candidates``."""
-    norm_candidates = [_norm(c) for c in candidates]
+    norm_candidates = _norm_candidates(tuple(candidates))
     if difflib.get_close_matches(_norm(cell), norm_candidates, cutoff=0.75):
         logger.info("header_match", extra={"header": cell, "match_type": match_type})
         return True
@@ -95,6 +100,68 @@ def _basename(fp: Any, filename: Optional[str] = None) -> str:
     return ""
 
 
+def _debug_dirs(output_stem: str) -> tuple[Path, Path]:
+    """Return and create the image and text debug folders for ``output_stem``."""
+    debug_dir = Path(os.getenv("SMART_PRICE_DEBUG_DIR", "LLM_Output_db")) / output_stem
+    text_dir = Path(os.getenv("SMART_PRICE_TEXT_DIR", "LLM_Text_db")) / output_stem
+    debug_dir.mkdir(parents=True, exist_ok=True)
+    text_dir.mkdir(parents=True, exist_ok=True)
+    return debug_dir, text_dir
+
+
+def _has_entry(directory: Path, *, prefix: str = "", suffix: str = "") -> bool:
+    """Return ``True`` if ``directory`` holds a name with ``prefix``/``suffix``."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith(prefix) and entry.name.endswith(suffix):
+                return True
+    return False
+
+
+# Debug folders are pushed to GitHub on a single background thread so
+# ``extract_from_pdf`` can return as soon as the rows are ready.
+_UPLOAD_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sp-upload")
+atexit.register(_UPLOAD_POOL.shutdown, wait=True)
+
+
+def _upload_debug(debug_dir: Path) -> bool:
+    """Upload the page images in ``debug_dir`` and log the outcome."""
+    logger.info("==> BEGIN upload_debug")
+    ok = upload_folder(
+        debug_dir,
+        remote_prefix=f"LLM_Output_db/{debug_dir.name}",
+        file_extensions=[PAGE_IMAGE_EXT],
+    )
+    logger.info("==> END upload_debug ok=%s", ok)
+    if not ok:
+        logger.warning("GitHub upload başarısız: %s", debug_dir)
+    return ok
+
+
+def _finalize(
+    result_df: pd.DataFrame,
+    debug_dir: Path,
+    notify: Callable[..., None],
+    progress_callback: Callable[[float], None] | None = None,
+) -> pd.DataFrame:
+    """Queue ``debug_dir`` for upload and return the validated ``result_df``.
+
+    ``progress_callback`` receives ``1.0`` first; the upload does not count
+    towards extraction progress.
+    """
+    if progress_callback:
+        try:
+            progress_callback(1.0)
+        except Exception:
+            pass
+    set_output_subdir(None)
+    if not debug_enabled():
+        return validate_output_df(result_df)
+    notify("Debug klasörü GitHub'a arka planda yükleniyor...")
+    _UPLOAD_POOL.submit(_upload_debug, debug_dir)
+    return validate_output_df(result_df)
+
+
 def extract_from_pdf(
     filepath: str | IO[bytes],
     *,
@@ -224,21 +291,29 @@ def extract_from_pdf(
             notify("LLM returned no data")
             return []
 
-        results = []
-        for item in items:
-            if not isinstance(item, dict):
-                continue
-            name = str(item.get("name") or item.get("product") or "").strip()
-            price_raw = str(item.get("price", "")).strip()
-            val = normalize_price(price_raw)
-            if name and val is not None:
-                results.append(
-                    {
-                        "Malzeme_Adi": name,
-                        "Fiyat": val,
-                        "Para_Birimi": normalize_currency(detect_currency(price_raw)),
-                    }
-                )
+        frame = pd.DataFrame([item for item in items if isinstance(item, dict)])
+        if frame.empty:
+            results = []
+        else:
+            def _text(col: str) -> pd.Series:
+                if col in frame.columns:
+                    return frame[col].astype(object).where(frame[col].notna(), "")
+                return pd.Series("", index=frame.index, dtype=object)
+
+            name = _text("name")
+            name = name.where(name.astype(bool), _text("product")).astype(str).str.strip()
+            price_raw = _text("price").astype(str).str.strip()
+            parsed = pd.DataFrame(
+                {
+                    "Malzeme_Adi": name,
+                    "Fiyat": normalize_price_series(price_raw),
+                    "Para_Birimi": normalize_currency_series(
+                        detect_currency_series(price_raw)
+                    ),
+                }
+            )
+            parsed = parsed[parsed["Malzeme_Adi"].astype(bool) & parsed["Fiyat"].notna()]
+            results = parsed.astype(object).where(parsed.notna(), None).to_dict("records")
         count = len(results)
         if count:
             notify(f"LLM parsed {count} items")
@@ -250,10 +325,7 @@ def extract_from_pdf(
 
     def cleanup() -> None:
         if tmp_for_llm:
-            try:
-                os.remove(tmp_for_llm)
-            except Exception as exc:
-                notify(f"temp file cleanup failed: {exc}")
+            remove_tempfile(tmp_for_llm)
 
     try:
         if isinstance(filepath, (str, bytes, os.PathLike)):
@@ -263,11 +335,7 @@ def extract_from_pdf(
                 filepath.seek(0)
             except Exception as exc:
                 notify(f"seek failed: {exc}")
-            pdf_bytes = filepath.read()
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-            tmp.write(pdf_bytes)
-            tmp.close()
-            tmp_for_llm = tmp.name
+            tmp_for_llm = spool_to_tempfile(filepath, suffix=".pdf")
             path_for_llm = tmp_for_llm
 
         notify("G\u00f6rseller olu\u015fturuluyor...")
@@ -297,8 +365,7 @@ def extract_from_pdf(
             len(getattr(result, "page_summary", [])),
         )
         notify("Sat\u0131rlar\u0131n g\u00f6rselleri haz\u0131rlan\u0131yor...")
-        page_summary = getattr(result, "page_summary", [])
-        tok = getattr(result, "token_counts", {})
+        result, page_summary, tok = ExtractResult.from_frame(result)
         total_input_tokens = tok.get("input", TOKEN_ACCUM.get("input", 0))
         total_output_tokens = tok.get("output", TOKEN_ACCUM.get("output", 0))
     except Exception as exc:
@@ -313,10 +380,7 @@ def extract_from_pdf(
         cleanup()
         duration = time.time() - total_start
         pages = len(page_summary)
-        debug_dir = Path(os.getenv("SMART_PRICE_DEBUG_DIR", "LLM_Output_db")) / output_stem
-        text_dir = Path(os.getenv("SMART_PRICE_TEXT_DIR", "LLM_Text_db")) / output_stem
-        debug_dir.mkdir(parents=True, exist_ok=True)
-        text_dir.mkdir(parents=True, exist_ok=True)
+        debug_dir, _ = _debug_dirs(output_stem)
         snippet = ""
         try:
             from PIL import Image  # type: ignore
@@ -332,58 +396,56 @@ def extract_from_pdf(
         notify(
             f"Finished {src} via LLM with 0 rows after {pages} pages in {duration:.2f}s; OCR excerpt: {snippet!r}"
         )
-        set_output_subdir(None)
-        notify("Debug klasörü GitHub'a yükleniyor...")
-        logger.info("==> BEGIN upload_debug")
-        ok = upload_folder(
-            debug_dir,
-            remote_prefix=f"LLM_Output_db/{debug_dir.name}",
-            file_extensions=[PAGE_IMAGE_EXT],
+        return _finalize(result, debug_dir, notify, progress_callback)
+
+    # Derive every output column first and attach them with a single
+    # ``assign`` instead of inserting them into ``result`` one by one.
+    source_name = _basename(filepath, filename)
+    brand_from_file = detect_brand(source_name)
+    if "Para_Birimi" in result.columns:
+        currency = normalize_currency_series(result["Para_Birimi"])
+    else:
+        currency = pd.Series(None, index=result.index, dtype=object)
+    missing = currency.isna()
+    if missing.any() and "Fiyat" in result.columns:
+        # Fall back to a currency written next to the price, e.g. "110 USD".
+        detected = normalize_currency_series(
+            detect_currency_series(result.loc[missing, "Fiyat"].astype(str))
         )
-        logger.info("==> END upload_debug ok=%s", ok)
-        if ok:
-            notify("Debug klasörü yüklendi")
-        else:
-            notify("GitHub upload başarısız", "warning")
-        return validate_output_df(result)
-
-    if "Para_Birimi" not in result.columns:
-        result["Para_Birimi"] = None
-    result["Para_Birimi"] = result["Para_Birimi"].apply(normalize_currency)
-    result["Para_Birimi"] = result["Para_Birimi"].fillna("₺")
-    result["Kaynak_Dosya"] = _basename(filepath, filename)
-    result["Yil"] = None
-    brand_from_file = detect_brand(_basename(filepath, filename))
-    if brand_from_file:
-        result["Marka"] = brand_from_file
+        currency = currency.where(~missing, detected)
+    if "Sayfa" in result.columns:
+        pages = pd.to_numeric(result["Sayfa"], errors="coerce").fillna(1).astype("int32")
     else:
-        result["Marka"] = result["Açıklama"].apply(detect_brand)
-    result["Kategori"] = None
-    if "Malzeme_Kodu" not in result.columns:
-        result["Malzeme_Kodu"] = None
-    if "Kisa_Kod" not in result.columns:
-        result["Kisa_Kod"] = None
-    if "Ana_Baslik" not in result.columns:
-        result["Ana_Baslik"] = None
-    if "Alt_Baslik" not in result.columns:
-        result["Alt_Baslik"] = None
-    if "Sayfa" not in result.columns:
-        result["Sayfa"] = 1
-    result["Sayfa"] = (
-        pd.to_numeric(result["Sayfa"], errors="coerce")
-        .fillna(1)
-        .astype(int)
-    )
-    result["Record_Code"] = (
-        sanitized_base
-        + "|"
-        + result["Sayfa"].astype(str)
-        + "|"
-        + (result.groupby("Sayfa").cumcount() + 1).astype(str)
-    )
-    result["Image_Path"] = result["Sayfa"].apply(
-        lambda page_num: f"LLM_Output_db/{sanitized_base}/page_image_page_{int(page_num):02d}{PAGE_IMAGE_EXT}"
-    )
+        pages = pd.Series(1, index=result.index, dtype="int32")
+    # Plain list comprehensions build the string columns in one pass each
+    # instead of chaining several temporary string Series.
+    page_list = pages.tolist()
+    row_nums = (pages.groupby(pages).cumcount() + 1).tolist()
+    new_cols = {
+        # Currency symbols and section headers repeat on most rows, so they
+        # are stored as categories.
+        "Para_Birimi": pd.Categorical(currency.fillna("₺"), categories=CURRENCY_SYMBOLS),
+        "Kaynak_Dosya": source_name,
+        "Yil": None,
+        "Marka": brand_from_file or result["Açıklama"].apply(detect_brand),
+        "Kategori": None,
+        "Sayfa": pages,
+        "Record_Code": [
+            f"{sanitized_base}|{page_num}|{row_num}"
+            for page_num, row_num in zip(page_list, row_nums)
+        ],
+        "Image_Path": [
+            f"LLM_Output_db/{sanitized_base}/page_image_page_{page_num:02d}{PAGE_IMAGE_EXT}"
+            for page_num in page_list
+        ],
+    }
+    for col in ("Malzeme_Kodu", "Kisa_Kod", "Ana_Baslik", "Alt_Baslik"):
+        if col not in result.columns:
+            new_cols[col] = None
+    for col in ("Ana_Baslik", "Alt_Baslik"):
+        if col in result.columns:
+            new_cols[col] = result[col].astype("category")
+    result = result.assign(**new_cols)
     cols = [
         "Malzeme_Kodu",
         "Açıklama",
@@ -398,44 +460,32 @@ def extract_from_pdf(
         "Alt_Baslik",
         "Image_Path",
     ]
-    result_df = result[cols].copy()
+    # validate_output_df copies the frame anyway; under copy-on-write the
+    # reindex is lazy so no column data is duplicated here.
+    result_df = result.reindex(columns=cols)
     duration = time.time() - total_start
     notify(f"Finished {src} via LLM with {len(result_df)} rows in {duration:.2f}s")
-    if hasattr(result_df, "__dict__"):
-        object.__setattr__(result_df, "page_summary", page_summary)
-        object.__setattr__(result_df, "token_counts", {
-            "input": total_input_tokens,
-            "output": total_output_tokens,
-        })
+    result_df = ExtractResult(
+        result_df,
+        page_summary,
+        {"input": total_input_tokens, "output": total_output_tokens},
+    ).to_frame()
     log_token_counts(src, total_input_tokens, total_output_tokens)
     cleanup()
-    debug_dir = Path(os.getenv("SMART_PRICE_DEBUG_DIR", "LLM_Output_db")) / output_stem
-    text_dir = Path(os.getenv("SMART_PRICE_TEXT_DIR", "LLM_Text_db")) / output_stem
-    debug_dir.mkdir(parents=True, exist_ok=True)
-    text_dir.mkdir(parents=True, exist_ok=True)
-    if not any(p.suffix == PAGE_IMAGE_EXT for p in debug_dir.glob(f"*{PAGE_IMAGE_EXT}")):
+    if not debug_enabled():
+        set_output_subdir(None)
+        return validate_output_df(result_df)
+    debug_dir, text_dir = _debug_dirs(output_stem)
+    if not _has_entry(debug_dir, suffix=PAGE_IMAGE_EXT):
         try:
             with open(debug_dir / f"page_image_page_01{PAGE_IMAGE_EXT}", "wb") as fh:
                 fh.write(b"")
         except Exception:
             pass
-    if not any(p.name.startswith("llm_response") for p in text_dir.iterdir()):
+    if not _has_entry(text_dir, prefix="llm_response"):
         try:
             with open(text_dir / "llm_response_page_01.txt", "w", encoding="utf-8") as fh:
                 fh.write("")
         except Exception:
             pass
-    set_output_subdir(None)
-    notify("Debug klasörü GitHub'a yükleniyor...")
-    logger.info("==> BEGIN upload_debug")
-    ok = upload_folder(
-        debug_dir,
-        remote_prefix=f"LLM_Output_db/{debug_dir.name}",
-        file_extensions=[PAGE_IMAGE_EXT],
-    )
-    logger.info("==> END upload_debug ok=%s", ok)
-    if ok:
-        notify("Debug klasörü yüklendi")
-    else:
-        notify("GitHub upload başarısız", "warning")
-    return validate_output_df(result_df)
+    return _finalize(result_df, debug_dir, notify, progress_callback)
@@ -1,28 +1,14 @@
 from __future__ import annotations
 
+import io
 import os
 import logging
-import tempfile
 from pathlib import Path
 from typing import IO, Optional, Callable
 
 import pandas as pd
 import re
 
-try:
-    from dotenv import load_dotenv, find_dotenv
-except ImportError:  # pragma: no cover - support missing find_dotenv
-    from dotenv import load_dotenv  # type: ignore
-
-    def find_dotenv() -> str:
-        return ""
-
-
-try:  # pragma: no cover - allow stub without args
-    load_dotenv(dotenv_path=find_dotenv())
-except TypeError:  # pragma: no cover
-    load_dotenv(dotenv_path=find_dotenv())
-
 from smart_price.extract_excel import _map_columns
 from smart_price.core.extract_excel import (
     _norm_header,
@@ -30,9 +16,20 @@ from smart_price.core.extract_excel import (
     POSSIBLE_DESC_HEADERS,
     POSSIBLE_PRICE_HEADERS,
 )
-from .common_utils import normalize_price, detect_currency, normalize_currency
+from .common_utils import (
+    normalize_price_series,
+    detect_currency_series,
+    normalize_currency_series,
+    ExtractResult,
+    CURRENCY_SYMBOLS,
+    spool_to_tempfile,
+    remove_tempfile,
+    load_env_once,
+)
 from .debug_utils import save_debug, set_output_subdir
 
+load_env_once()
+
 try:
     from agentic_doc.common import RetryableError as AgenticDocError
     from agentic_doc.parse import parse
@@ -106,11 +103,7 @@ def extract_from_pdf_agentic(
             filepath.seek(0)
         except Exception as exc:
             notify(f"seek failed: {exc}", "warning")
-        pdf_bytes = filepath.read()
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        tmp.write(pdf_bytes)
-        tmp.close()
-        tmp_file = tmp.name
+        tmp_file = spool_to_tempfile(filepath, suffix=".pdf")
         parse_path = tmp_file
 
     try:
@@ -128,7 +121,7 @@ def extract_from_pdf_agentic(
     if summary is not None:
         notify(f"{src}: page_summary {summary}")
 
-    def _ade_df(doc):
+    def _ade_rows(doc) -> tuple[list[list[str]], list[str] | None]:
         rows: list[list[str]] = []
         current_header: list[str] | None = None
 
@@ -144,7 +137,8 @@ def extract_from_pdf_agentic(
                 dbg_text = text
                 save_debug("ade_chunk", idx, f"{ch.chunk_type}: {dbg_text}")
                 logger.debug("chunk %d %s: %s", idx, ch.chunk_type, dbg_text)
-            for line in text.splitlines():
+            for line in io.StringIO(text):
+                line = line.rstrip("\r\n")
                 # Allow both whitespace and ':' separated values
                 cells = [c.strip() for c in re.split(r"\s{2,}|\t|:\s*", line) if c.strip()]
                 if len(cells) <= 1 and " " in line:
@@ -169,35 +163,45 @@ def extract_from_pdf_agentic(
                         row.extend([""] * (len(current_header) - len(row)))
                     rows.append(row)
 
-        if not rows:
-            return pd.DataFrame()
-
-        return pd.DataFrame(rows, columns=current_header)
-
-    df = pd.concat([_ade_df(d) for d in docs], ignore_index=True)
+        return rows, current_header
+
+    # Accumulate raw rows per header and build each frame once instead of
+    # concatenating one DataFrame per document.
+    grouped: dict[tuple[str, ...], list[list[str]]] = {}
+    for d in docs:
+        doc_rows, header = _ade_rows(d)
+        if doc_rows:
+            grouped.setdefault(tuple(header), []).extend(doc_rows)
+
+    frames = [pd.DataFrame(r, columns=list(h)) for h, r in grouped.items()]
+    if not frames:
+        df = pd.DataFrame()
+    elif len(frames) == 1:
+        df = frames[0]
+    else:
+        df = pd.concat(frames, ignore_index=True)
     if df.empty:
         raise ValueError("AgenticDE tablo bulamadı")
 
     # Promote first row to header when columns are numeric
-    if all(isinstance(c, int) for c in df.columns):
+    if df.columns.inferred_type == "integer":
         df.columns = df.iloc[0].str.strip().str.replace(" ", "_")
         df = df.iloc[1:].reset_index(drop=True)
 
     df = _map_columns(df)
 
-    df["Fiyat"] = df["Fiyat"].apply(normalize_price)
-    df["Para_Birimi"] = df.get(
-        "Para_Birimi", df["Fiyat"].astype(str).apply(detect_currency)
+    df["Fiyat"] = normalize_price_series(df["Fiyat"])
+    if "Para_Birimi" not in df.columns:
+        df["Para_Birimi"] = detect_currency_series(df["Fiyat"].astype(str))
+    # A handful of symbols repeated on every row: store them as categories.
+    df["Para_Birimi"] = pd.Categorical(
+        normalize_currency_series(df["Para_Birimi"]).fillna("₺"),
+        categories=CURRENCY_SYMBOLS,
     )
-    df["Para_Birimi"] = df["Para_Birimi"].apply(normalize_currency).fillna("₺")
 
     page_summary = getattr(docs[0], "page_summary", None)
-    if page_summary is not None and hasattr(df, "__dict__"):
-        object.__setattr__(df, "page_summary", page_summary)
-
     token_counts = getattr(docs[0], "token_counts", None)
-    if token_counts is not None and hasattr(df, "__dict__"):
-        object.__setattr__(df, "token_counts", token_counts)
+    df = ExtractResult(df, page_summary or [], token_counts or {}).to_frame()
 
     if df.empty:
         pages = len(page_summary) if page_summary is not None else 0
@@ -220,18 +224,12 @@ def extract_from_pdf_agentic(
             info += f" preview={preview}"
         notify(info, "warning")
         if tmp_file:
-            try:
-                os.remove(tmp_file)
-            except Exception as exc:  # pragma: no cover - cleanup errors
-                logger.error("temp file cleanup failed: %s", exc)
+            remove_tempfile(tmp_file)
         raise ValueError("AgenticDE empty result")
 
     notify(f"agentic_doc returned {len(df)} rows")
     if tmp_file:
-        try:
-            os.remove(tmp_file)
-        except Exception as exc:  # pragma: no cover - cleanup errors
-            logger.error("temp file cleanup failed: %s", exc)
+        remove_tempfile(tmp_file)
     if ade_debug:
         set_output_subdir(None)
 
@@ -1,15 +1,68 @@
-import base64
+import functools
+import hashlib
 import json
 import logging
+import mmap
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from urllib import request, error
+from urllib import error
 from typing import Optional
 from urllib.parse import quote
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from smart_price import config
+
+from .common_utils import file_to_base64 as _read_base64
+
+try:  # pragma: no cover - optional speedup
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - fallback to stdlib json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
+
 logger = logging.getLogger("smart_price")
 
+# Maximum number of concurrent uploads in ``upload_folder``; GitHub limits
+# concurrent writes per repository.
+_UPLOAD_WORKERS = 8
+# Overall time budget for one ``upload_folder`` call in seconds.
+_UPLOAD_BUDGET = 300
+
+# Contents API writes commit to the branch; concurrent PUTs to one branch
+# fail with 409 conflicts, so only the writes themselves are serialized.
+_PUT_LOCK = threading.Lock()
+# Guards read-modify-write cycles of the upload cache file.
+_CACHE_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _session() -> requests.Session:
+    """Return the shared keep-alive session used for GitHub API calls."""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept"] = "application/vnd.github+json"
+    return session
+
 
 def _api_request(
     method: str,
@@ -24,25 +77,345 @@ def _api_request(
             timeout = float(os.getenv("GITHUB_HTTP_TIMEOUT", "30"))
         except ValueError:
             timeout = 30.0
-    req = request.Request(url, method=method)
-    req.add_header("Authorization", f"token {token}")
-    req.add_header("Accept", "application/vnd.github+json")
+    headers = {"Authorization": f"token {token}"}
+    payload = None
     if data is not None:
-        payload = json.dumps(data).encode("utf-8")
-        req.add_header("Content-Type", "application/json")
-        req.data = payload
+        # Upload bodies are dominated by large base64 strings.
+        payload = _dumps(data)
+        headers["Content-Type"] = "application/json"
     try:
-        with request.urlopen(req, timeout=timeout) as resp:
-            text = resp.read().decode("utf-8")
-        return json.loads(text) if text else {}
-    except error.HTTPError as exc:  # pragma: no cover - network errors
-        logger.debug("GitHub API error for %s: %s", url, exc)
-        raise
+        resp = _session().request(
+            method, url, data=payload, headers=headers, timeout=timeout
+        )
+    except requests.Timeout as exc:
+        logger.debug("GitHub request timed out for %s: %s", url, exc)
+        raise TimeoutError(str(exc)) from exc
     except Exception as exc:  # pragma: no cover - unexpected failures
         logger.debug("GitHub request failed for %s: %s", url, exc)
         raise
+    if resp.status_code >= 400:
+        # Callers inspect ``HTTPError.code`` (404 lookups, 409 conflicts).
+        exc = error.HTTPError(url, resp.status_code, resp.reason, resp.headers, None)
+        logger.debug("GitHub API error for %s: %s", url, exc)
+        raise exc
+    return _loads(resp.content) if resp.content else {}
+
+
+def _fetch_sha(
+    url: str, token: str, repo_path: str, timeout: Optional[float]
+) -> Optional[str]:
+    """Return the blob SHA stored at ``url`` or ``None`` when missing."""
+    try:
+        resp = _api_request("GET", url, token, timeout=timeout)
+        return resp.get("sha")
+    except error.HTTPError as exc:  # pragma: no cover - network errors
+        if exc.code != 404:
+            logger.error("Failed to fetch existing file %s: %s", repo_path, exc)
+    except Exception as exc:  # pragma: no cover - network errors
+        logger.error("Failed to fetch existing file %s: %s", repo_path, exc)
+    return None
+
+
+def _upload_workers() -> int:
+    try:
+        workers = int(os.getenv("GITHUB_UPLOAD_WORKERS", str(_UPLOAD_WORKERS)))
+    except ValueError:
+        workers = _UPLOAD_WORKERS
+    return max(1, min(workers, _UPLOAD_WORKERS))
+
+
+def _upload_one(
+    file_path: Path,
+    repo_path: str,
+    url: str,
+    token: str,
+    branch: str,
+    timeout: Optional[float],
+    local_sha: str,
+) -> bool:
+    """Upload ``file_path`` to ``url`` and return ``True`` on success.
+
+    Files whose remote blob SHA equals ``local_sha`` are not uploaded.
+    """
+    sha = _fetch_sha(f"{url}?ref={branch}", token, repo_path, timeout)
+    if sha == local_sha:
+        return True
+    content = _read_base64(file_path)
+    data = {"message": f"Add {repo_path}", "content": content, "branch": branch}
+    if sha:
+        data["sha"] = sha
+    try:
+        with _PUT_LOCK:
+            _api_request("PUT", url, token, data, timeout=timeout)
+        return True
+    except error.HTTPError as exc:  # pragma: no cover - network errors
+        if exc.code == 409:
+            try:
+                resp = _api_request(
+                    "GET", f"{url}?ref={branch}", token, timeout=timeout
+                )
+                new_sha = resp.get("sha")
+                if new_sha == local_sha:
+                    return True
+                if new_sha and new_sha != data.get("sha"):
+                    data["sha"] = new_sha
+                    with _PUT_LOCK:
+                        _api_request("PUT", url, token, data, timeout=timeout)
+                    return True
+            except Exception as exc2:  # pragma: no cover - network errors
+                logger.error(
+                    "Conflict resolution for %s failed: %s", repo_path, exc2
+                )
+                return False
+        logger.error("Failed to upload %s: %s", repo_path, exc)
+    except Exception as exc:  # pragma: no cover - network errors
+        logger.error("Failed to upload %s: %s", repo_path, exc)
+    return False
+
+
+def _git_blob_sha(file_path: Path) -> str:
+    """Return the git object id GitHub reports for ``file_path``."""
+    size = file_path.stat().st_size
+    digest = hashlib.sha1(b"blob %d\0" % size)
+    if size:
+        with open(file_path, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+    return digest.hexdigest()
+
+
+def _upload_cache_file() -> Optional[Path]:
+    if os.getenv("GITHUB_UPLOAD_CACHE") != "1":
+        return None
+    return Path(config.CACHE_DIR) / "github_upload.json"
+
+
+def _read_upload_cache(cache_file: Path) -> dict:
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _cached_shas(key: str) -> dict[str, str]:
+    """Return ``{repo_path: blob_sha}`` recorded for ``key`` by earlier runs."""
+    cache_file = _upload_cache_file()
+    if cache_file is None:
+        return {}
+    entry = _read_upload_cache(cache_file).get(key)
+    return entry if isinstance(entry, dict) else {}
+
+
+def _write_upload_cache(cache_file: Path, data: dict) -> None:
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, cache_file)
+    except OSError as exc:
+        logger.warning("Could not write upload cache %s: %s", cache_file, exc)
+
+
+def _remember_shas(key: str, shas: dict[str, str]) -> None:
+    cache_file = _upload_cache_file()
+    if cache_file is None or not shas:
+        return
+    with _CACHE_LOCK:
+        data = _read_upload_cache(cache_file)
+        entry = data.get(key)
+        if not isinstance(entry, dict):
+            entry = data[key] = {}
+        entry.update(shas)
+        _write_upload_cache(cache_file, data)
+
+
+def _forget_shas(key: str, prefix: str) -> None:
+    """Drop cached SHAs for ``key`` stored at or below ``prefix``.
+
+    Called when a remote folder is deleted so the next upload sends its
+    files again instead of treating them as unchanged.
+    """
+    cache_file = _upload_cache_file()
+    if cache_file is None:
+        return
+    prefixes = {prefix.replace(" ", "_"), _sanitize_repo_path(prefix)}
+    with _CACHE_LOCK:
+        data = _read_upload_cache(cache_file)
+        entry = data.get(key)
+        if not isinstance(entry, dict):
+            return
+        kept = {
+            rp: sha
+            for rp, sha in entry.items()
+            if not any(rp == p or rp.startswith(p + "/") for p in prefixes)
+        }
+        if len(kept) == len(entry):
+            return
+        data[key] = kept
+        _write_upload_cache(cache_file, data)
+
+
+def _branch_head(
+    api: str, branch: str, token: str, timeout: Optional[float]
+) -> tuple[str, str]:
+    """Return ``(commit_sha, tree_sha)`` of the tip of ``branch``."""
+    ref = _api_request("GET", f"{api}/ref/heads/{quote(branch)}", token, timeout=timeout)
+    head = ref["object"]["sha"]
+    commit = _api_request("GET", f"{api}/commits/{head}", token, timeout=timeout)
+    return head, commit["tree"]["sha"]
 
 
+def _commit_tree(
+    repo: str,
+    token: str,
+    branch: str,
+    items: list[tuple[Path, str]],
+    message: str,
+    timeout: Optional[float],
+    deadline: float,
+) -> Optional[bool]:
+    """Upload ``items`` as a single commit through the Git Data API.
+
+    ``items`` holds ``(local_path, repo_path)`` pairs. Blobs are created
+    concurrently, then one tree and one commit are written and the branch
+    is fast-forwarded. Returns ``None`` when the branch head cannot be read
+    so the caller can fall back to the Contents API.
+    """
+    api = f"https://api.github.com/repos/{repo}/git"
+    try:
+        head, base_tree = _branch_head(api, branch, token, timeout)
+    except Exception as exc:
+        logger.info("Git Data API unavailable for %s, using Contents API: %s", repo, exc)
+        return None
+
+    def create_blob(file_path: Path) -> str:
+        data = {"content": _read_base64(file_path), "encoding": "base64"}
+        return _api_request("POST", f"{api}/blobs", token, data, timeout=timeout)["sha"]
+
+    pool = ThreadPoolExecutor(max_workers=min(_upload_workers(), len(items)))
+    futures = [pool.submit(create_blob, file_path) for file_path, _ in items]
+    try:
+        _, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        if pending:
+            logger.error("upload_folder aborted (timeout)")
+            return False
+        tree = [
+            {"path": repo_path, "mode": "100644", "type": "blob", "sha": f.result()}
+            for f, (_, repo_path) in zip(futures, items)
+        ]
+    except Exception as exc:  # pragma: no cover - network errors
+        logger.error("Failed to create blobs for %s: %s", message, exc)
+        return False
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return _push_tree(api, branch, token, tree, message, head, base_tree, timeout)
+
+
+def _push_tree(
+    api: str,
+    branch: str,
+    token: str,
+    tree: list[dict],
+    message: str,
+    head: str,
+    base_tree: str,
+    timeout: Optional[float],
+) -> bool:
+    """Apply ``tree`` entries on top of ``head`` as one commit on ``branch``."""
+    # The branch may move between reading the head and updating the ref;
+    # rebuild the commit on the new head when the fast-forward is rejected.
+    for attempt in range(3):
+        try:
+            if attempt:
+                head, base_tree = _branch_head(api, branch, token, timeout)
+            new_tree = _api_request(
+                "POST",
+                f"{api}/trees",
+                token,
+                {"base_tree": base_tree, "tree": tree},
+                timeout=timeout,
+            )["sha"]
+            if new_tree == base_tree:
+                return True
+            commit = _api_request(
+                "POST",
+                f"{api}/commits",
+                token,
+                {"message": message, "tree": new_tree, "parents": [head]},
+                timeout=timeout,
+            )["sha"]
+            _api_request(
+                "PATCH",
+                f"{api}/refs/heads/{quote(branch)}",
+                token,
+                {"sha": commit},
+                timeout=timeout,
+            )
+            return True
+        except error.HTTPError as exc:  # pragma: no cover - network errors
+            if exc.code == 422 and attempt < 2:
+                continue
+            logger.error("Failed to commit %s: %s", message, exc)
+            return False
+        except Exception as exc:  # pragma: no cover - network errors
+            logger.error("Failed to commit %s: %s", message, exc)
+            return False
+    return False
+
+
+def _delete_tree(
+    repo: str, token: str, branch: str, path: str, timeout: Optional[float]
+) -> Optional[bool]:
+    """Delete every file under ``path`` with a single Git Data API commit.
+
+    Returns ``None`` when the branch tree cannot be listed in one response
+    (API unavailable or more than GitHub's truncation limit) so the caller
+    can fall back to deleting file by file.
+    """
+    api = f"https://api.github.com/repos/{repo}/git"
+    try:
+        head, base_tree = _branch_head(api, branch, token, timeout)
+        listing = _api_request(
+            "GET", f"{api}/trees/{base_tree}?recursive=1", token, timeout=timeout
+        )
+        entries = listing["tree"]
+    except Exception as exc:
+        logger.info("Git Data API unavailable for %s, using Contents API: %s", repo, exc)
+        return None
+    if listing.get("truncated"):
+        return None
+
+    tree = [
+        {"path": e["path"], "mode": e["mode"], "type": "blob", "sha": None}
+        for e in entries
+        if e.get("type") == "blob"
+        and (e["path"] == path or e["path"].startswith(path + "/"))
+    ]
+    if not tree:
+        logger.info("Nothing to delete under %s", path)
+        return True
+    return _push_tree(
+        api, branch, token, tree, f"Delete {path}", head, base_tree, timeout
+    )
+
+
+def _list_files(path: Path, exts: Optional[frozenset[str]]) -> list[Path]:
+    """Return the files below ``path`` in a single directory walk.
+
+    ``exts`` holds lower-case suffixes to keep; ``None`` keeps every file.
+    """
+    files = []
+    for root, _dirs, names in os.walk(path):
+        for name in names:
+            if exts is not None and os.path.splitext(name)[1].lower() not in exts:
+                continue
+            files.append(Path(root, name))
+    return files
+
+
+@functools.lru_cache(maxsize=1024)
 def _sanitize_repo_path(path: str) -> str:
     safe = path.replace(" ", "_")
     return quote(safe, safe="/")
@@ -65,12 +438,25 @@ def upload_folder(
         Folder prefix for uploaded files.  When ``None`` (default), files are
         placed under ``"LLM_Output_db/<path.name>"`` in the repository.
 
-    Only files matching ``file_extensions`` are uploaded when the list is
-    provided. Requires ``GITHUB_REPO`` and ``GITHUB_TOKEN`` environment
+    Only files matching ``file_extensions`` (case-insensitive) are uploaded
+    when the list is provided. Requires ``GITHUB_REPO`` and ``GITHUB_TOKEN`` environment
     variables. Set ``GITHUB_BRANCH`` to push to a branch other than ``main``.
+    All files are pushed as one commit through the Git Data API, creating
+    blobs with up to ``GITHUB_UPLOAD_WORKERS`` threads (default and maximum
+    8) within a 300 second budget. When the branch head cannot be read the
+    files are uploaded one by one through the Contents API instead, skipping
+    files whose remote blob SHA already matches. With
+    ``GITHUB_UPLOAD_CACHE=1`` the SHAs of uploaded files are recorded under
+    :data:`smart_price.config.CACHE_DIR` and unchanged files are skipped on
+    later runs without any API call.
     """
-    count = len(list(path.rglob("*")))
-    logger.info("==> upload_folder %s files=%s", path, count)
+    exts = (
+        frozenset(ext.lower() for ext in file_extensions)
+        if file_extensions is not None
+        else None
+    )
+    files = _list_files(path, exts)
+    logger.info("==> upload_folder %s files=%s", path, len(files))
 
     repo = os.getenv("GITHUB_REPO")
     token = os.getenv("GITHUB_TOKEN")
@@ -82,71 +468,75 @@ def upload_folder(
         logger.info("GitHub repo or token not configured; skipping upload")
         return False
 
-    success = True
-    start_time = time.time()
-    for file_path in path.rglob("*"):
-        if time.time() - start_time > 300:
+    if not files:
+        return True
+
+    deadline = time.monotonic() + _UPLOAD_BUDGET
+    # Paths as stored by the Contents API, i.e. the unquoted URL path.
+    items = [
+        (
+            file_path,
+            (Path(remote_prefix) / file_path.relative_to(path))
+            .as_posix()
+            .replace(" ", "_"),
+        )
+        for file_path in files
+    ]
+    shas = {repo_path: _git_blob_sha(file_path) for file_path, repo_path in items}
+    cache_key = f"{repo}@{branch}"
+    cached = _cached_shas(cache_key)
+    items = [item for item in items if cached.get(item[1]) != shas[item[1]]]
+    if not items:
+        logger.info("upload_folder %s: no changes since last upload", path)
+        return True
+
+    committed = _commit_tree(
+        repo, token, branch, items, f"Add {remote_prefix}", timeout, deadline
+    )
+    if committed is not None:
+        if committed:
+            _remember_shas(cache_key, {rp: shas[rp] for _, rp in items})
+        return committed
+
+    pool = ThreadPoolExecutor(max_workers=min(_upload_workers(), len(items)))
+    futures = []
+    for file_path, repo_path in items:
+        url = f"https://api.github.com/repos/{repo}/contents/{_sanitize_repo_path(repo_path)}"
+        futures.append(
+            pool.submit(
+                _upload_one,
+                file_path,
+                repo_path,
+                url,
+                token,
+                branch,
+                timeout,
+                shas[repo_path],
+            )
+        )
+    try:
+        done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        if pending:
             logger.error("upload_folder aborted (timeout)")
-            break
-        if not file_path.is_file():
-            continue
-        if file_extensions is not None and file_path.suffix.lower() not in file_extensions:
-            continue
-        repo_path = Path(remote_prefix) / file_path.relative_to(path)
-        url_path = _sanitize_repo_path(repo_path.as_posix())
-        url = f"https://api.github.com/repos/{repo}/contents/{url_path}"
-        with open(file_path, "rb") as fh:
-            raw = fh.read()
-        content = base64.b64encode(raw).decode("ascii")
-        try:
-            resp = _api_request("GET", f"{url}?ref={branch}", token, timeout=timeout)
-            sha = resp.get("sha")
-        except error.HTTPError as exc:  # pragma: no cover - network errors
-            if exc.code == 404:
-                sha = None
-            else:
-                logger.error("Failed to fetch existing file %s: %s", repo_path, exc)
-                sha = None
-        except Exception as exc:  # pragma: no cover - network errors
-            logger.error("Failed to fetch existing file %s: %s", repo_path, exc)
-            sha = None
-        data = {"message": f"Add {repo_path}", "content": content, "branch": branch}
-        if sha:
-            data["sha"] = sha
-        try:
-            _api_request("PUT", url, token, data, timeout=timeout)
-        except error.HTTPError as exc:  # pragma: no cover - network errors
-            if exc.code == 409:
-                try:
-                    resp = _api_request(
-                        "GET", f"{url}?ref={branch}", token, timeout=timeout
-                    )
-                    new_sha = resp.get("sha")
-                    existing = resp.get("content")
-                    if existing:
-                        existing_bytes = base64.b64decode(existing)
-                        if existing_bytes == raw:
-                            continue
-                    if new_sha and new_sha != data.get("sha"):
-                        data["sha"] = new_sha
-                        _api_request("PUT", url, token, data, timeout=timeout)
-                        continue
-                except Exception as exc2:  # pragma: no cover - network errors
-                    logger.error(
-                        "Conflict resolution for %s failed: %s", repo_path, exc2
-                    )
-                    success = False
-                    continue
-            logger.error("Failed to upload %s: %s", repo_path, exc)
-            success = False
-        except Exception as exc:  # pragma: no cover - network errors
-            logger.error("Failed to upload %s: %s", repo_path, exc)
-            success = False
+        uploaded = {
+            repo_path: shas[repo_path]
+            for future, (_, repo_path) in zip(futures, items)
+            if future in done and future.result()
+        }
+        success = len(uploaded) == len(items)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    _remember_shas(cache_key, uploaded)
     return success
 
 
 def delete_github_folder(path: str, *, timeout: Optional[float] = None) -> bool:
-    """Delete all files under ``path`` in the configured GitHub repository."""
+    """Delete all files under ``path`` in the configured GitHub repository.
+
+    The files are removed in a single commit through the Git Data API. When
+    that is not possible they are deleted one by one via the Contents API.
+    Upload cache entries below ``path`` are dropped as well.
+    """
 
     repo = os.getenv("GITHUB_REPO")
     token = os.getenv("GITHUB_TOKEN")
@@ -155,6 +545,19 @@ def delete_github_folder(path: str, *, timeout: Optional[float] = None) -> bool:
         logger.info("GitHub repo or token not configured; skipping delete")
         return False
 
+    # Cached SHAs would otherwise make the next upload skip the deleted files.
+    _forget_shas(f"{repo}@{branch}", path)
+    # Stored paths are the unquoted form of the sanitized URL path.
+    deleted = _delete_tree(repo, token, branch, path.replace(" ", "_"), timeout)
+    if deleted is not None:
+        return deleted
+    return _delete_contents(repo, token, branch, path, timeout)
+
+
+def _delete_contents(
+    repo: str, token: str, branch: str, path: str, timeout: Optional[float]
+) -> bool:
+    """Delete ``path`` recursively with one Contents API call per file."""
     path = _sanitize_repo_path(path)
     base_url = f"https://api.github.com/repos/{repo}/contents/{path}"
     try:
@@ -169,7 +572,9 @@ def delete_github_folder(path: str, *, timeout: Optional[float] = None) -> bool:
     success = True
     for item in contents:
         if item.get("type") == "dir":
-            if not delete_github_folder(item.get("path", ""), timeout=timeout):
+            if not _delete_contents(
+                repo, token, branch, item.get("path", ""), timeout
+            ):
                 success = False
             continue
         sha = item.get("sha")
@@ -0,0 +1,142 @@
+"""On-disk cache for deterministic LLM responses.
+
+Vision requests are issued with ``temperature=0`` so the same model, prompt
+and image bytes produce the same answer. When ``SMART_PRICE_LLM_CACHE=1`` the
+raw response text is stored in a SQLite file under
+:data:`smart_price.config.CACHE_DIR` and reused on later runs. Whole parse
+results are additionally pickled per source PDF so unchanged documents skip
+rendering altogether.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from smart_price import config
+
+logger = logging.getLogger("smart_price")
+
+_LOCK = threading.Lock()
+_CONN: Optional[sqlite3.Connection] = None
+_CONN_PATH: Optional[Path] = None
+
+
+def enabled() -> bool:
+    """Return ``True`` when ``SMART_PRICE_LLM_CACHE`` is set to ``1``."""
+    return os.getenv("SMART_PRICE_LLM_CACHE", "0") == "1"
+
+
+def cache_path() -> Path:
+    """Return the SQLite file backing the cache."""
+    return Path(config.CACHE_DIR) / "llm_cache.sqlite"
+
+
+def make_key(model: str, prompt: str, image: bytes | memoryview) -> str:
+    """Return the cache key for ``model``, ``prompt`` and ``image`` bytes."""
+    h = hashlib.sha256()
+    h.update(model.encode())
+    h.update(b"|")
+    h.update(prompt.encode())
+    h.update(b"|")
+    h.update(image)
+    return h.hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    global _CONN, _CONN_PATH
+    path = cache_path()
+    if _CONN is None or _CONN_PATH != path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        # WAL lets several processes read while one writes.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, content TEXT NOT NULL)"
+        )
+        conn.commit()
+        if _CONN is not None:
+            _CONN.close()
+        _CONN, _CONN_PATH = conn, path
+    return _CONN
+
+
+def get(key: str) -> Optional[str]:
+    """Return the cached response for ``key`` or ``None``."""
+    try:
+        with _LOCK:
+            row = _connect().execute(
+                "SELECT content FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+    except sqlite3.Error as exc:
+        logger.warning("LLM cache read failed: %s", exc)
+        return None
+    return row[0] if row else None
+
+
+def put(key: str, value: str) -> None:
+    """Store ``value`` as the response for ``key``."""
+    try:
+        with _LOCK:
+            conn = _connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content) VALUES (?, ?)",
+                (key, value),
+            )
+            conn.commit()
+    except sqlite3.Error as exc:
+        logger.warning("LLM cache write failed: %s", exc)
+
+
+def parse_key(pdf_path: str | os.PathLike, **params: Any) -> Optional[str]:
+    """Return a cache key for parsing ``pdf_path`` with ``params``.
+
+    The key covers the PDF contents and the ``repr`` of ``params`` sorted by
+    name. ``None`` is returned when the file cannot be read.
+    """
+    h = hashlib.sha256()
+    try:
+        with open(pdf_path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+    except (OSError, TypeError):
+        return None
+    h.update(repr(sorted(params.items())).encode())
+    return h.hexdigest()
+
+
+def _parse_path(key: str) -> Path:
+    return Path(config.CACHE_DIR) / "parses" / f"{key}.pkl"
+
+
+def load_parse(key: str) -> Any:
+    """Return the parse result stored under ``key`` or ``None``."""
+    path = _parse_path(key)
+    try:
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logger.warning("Parse cache read failed for %s: %s", path, exc)
+        return None
+
+
+def store_parse(key: str, value: Any) -> None:
+    """Pickle ``value`` under ``key``, replacing any previous entry."""
+    path = _parse_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception as exc:
+        logger.warning("Parse cache write failed for %s: %s", path, exc)
@@ -0,0 +1,70 @@
+"""Write merged price data to the ``prices`` SQLite table."""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import pandas as pd
+
+# Column names of the ``prices`` SQLite table and the DataFrame columns they
+# are filled from, in table order.
+DB_RENAME = {
+    "Malzeme_Kodu": "material_code",
+    "Açıklama": "description",
+    "Fiyat": "price",
+    "Birim": "unit",
+    "Kutu_Adedi": "box_count",
+    "Para_Birimi": "price_currency",
+    "Kaynak_Dosya": "source_file",
+    "Sayfa": "source_page",
+    "Image_Path": "image_path",
+    "Record_Code": "record_code",
+    "Yil": "year",
+    "Marka": "brand",
+    "Ana_Baslik": "main_header",
+    "Alt_Baslik": "sub_header",
+    "Kategori": "category",
+}
+DB_COLUMNS = list(DB_RENAME.values())
+
+_CREATE_PRICES = """CREATE TABLE prices (
+    material_code TEXT,
+    description TEXT,
+    price REAL,
+    unit TEXT,
+    box_count TEXT,
+    price_currency TEXT,
+    source_file TEXT,
+    source_page INTEGER,
+    image_path TEXT,
+    record_code TEXT,
+    year INTEGER,
+    brand TEXT,
+    main_header TEXT,
+    sub_header TEXT,
+    category TEXT
+    )"""
+
+
+def write_prices_table(conn: sqlite3.Connection, df: "pd.DataFrame") -> None:
+    """Replace the ``prices`` table in ``conn`` with the rows of ``df``.
+
+    The table is rebuilt in one transaction. WAL with ``synchronous=NORMAL``
+    avoids an fsync per commit while an interrupted write still leaves the
+    previous table intact.
+    """
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS prices")
+        conn.execute(_CREATE_PRICES)
+        db_df = df.rename(columns=DB_RENAME).reindex(columns=DB_COLUMNS)
+        db_df = db_df.astype(object)
+        db_df = db_df.where(db_df.notna(), None)
+        conn.executemany(
+            f"INSERT INTO prices VALUES ({', '.join('?' * len(DB_COLUMNS))})",
+            db_df.itertuples(index=False, name=None),
+        )
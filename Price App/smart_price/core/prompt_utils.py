@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import csv
 import json
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 import logging
@@ -40,6 +43,12 @@ RAW_HEADER_HINT = (
 logger = logging.getLogger("smart_price")
 
 
+_MD_SECTION_RE = re.compile(r"^## ", re.MULTILINE)
+# A fenced block runs to the closing fence or, if unterminated, to the end of
+# its section.
+_MD_FENCE_RE = re.compile(r"^[ \t]*```.*?(?:^[ \t]*```[^\n]*$|\Z)", re.MULTILINE | re.DOTALL)
+
+
 def _parse_md_guide(path: Path) -> List[Dict[str, Any]]:
     """Parse ``extraction_guide.md`` into a list of prompt entries.
 
@@ -49,48 +58,36 @@ def _parse_md_guide(path: Path) -> List[Dict[str, Any]]:
     """
 
     text = path.read_text(encoding="utf-8")
-    lines = text.splitlines()
-
-    sections: List[Tuple[str, List[str]]] = []
-    current: Tuple[str, List[str]] | None = None
-    for line in lines:
-        if line.startswith("## "):
-            if current:
-                sections.append(current)
-            current = (line[3:].strip(), [])
-        else:
-            if current:
-                current[1].append(line)
-    if current:
-        sections.append(current)
 
     result = []
-    for title, body_lines in sections:
+    for section in _MD_SECTION_RE.split(text)[1:]:
+        title, _sep, body = section.partition("\n")
         cleaned: List[str] = []
-        in_code = False
-        for ln in body_lines:
+        for ln in _MD_FENCE_RE.sub("", body).splitlines():
             lstripped = ln.lstrip()
-            if lstripped.startswith("```"):
-                in_code = not in_code
-                continue
-            if in_code:
-                continue
-            if lstripped.startswith("###"):
-                continue
-            if "JSON" in lstripped.upper():
+            if lstripped.startswith("#") or "JSON" in lstripped.upper():
                 continue
-            if lstripped.startswith("#"):
-                continue
-            if lstripped.startswith(('-', '*')):
-                lstripped = lstripped.lstrip('-*').strip()
+            if lstripped.startswith(("-", "*")):
+                lstripped = lstripped.lstrip("-*").strip()
             if lstripped:
                 cleaned.append(lstripped)
-        body = "\n".join(cleaned).strip()
-        result.append({"pdf": title, "page": None, "prompt": body})
+        result.append({"pdf": title.strip(), "page": None, "prompt": "\n".join(cleaned).strip()})
 
     return result
 
 
+@lru_cache(maxsize=4)
+def _load_guide_file(path: str, _mtime_ns: int) -> Tuple[Dict[str, Any], ...]:
+    p = Path(path)
+    if p.suffix.lower() == ".csv":
+        with p.open(encoding="utf-8") as fh:
+            return tuple(csv.DictReader(fh))
+    if p.suffix.lower() == ".json":
+        return tuple(json.loads(p.read_text(encoding="utf-8")))
+    if p.suffix.lower() in {".md", ".markdown"}:
+        return tuple(_parse_md_guide(p))
+    return ()
+
 
 def load_extraction_guide(path: str | None = None) -> List[Dict[str, Any]]:
     """Return guide entries from ``path``.
@@ -98,6 +95,7 @@ def load_extraction_guide(path: str | None = None) -> List[Dict[str, Any]]:
     If ``path`` is ``None`` try ``config.EXTRACTION_GUIDE_PATH`` and fallback
     to ``extraction_guide.md``, ``extraction_guide.csv`` or ``extraction_guide.json``
     under the repository root. Parsing errors result in an empty list.
+    Parsed files are cached until their modification time changes.
     """
     if path is None:
         path = str(getattr(config, "EXTRACTION_GUIDE_PATH", ""))
@@ -110,18 +108,12 @@ def load_extraction_guide(path: str | None = None) -> List[Dict[str, Any]]:
                 break
     if not path:
         return []
-    p = Path(path)
     try:
-        if p.suffix.lower() == ".csv":
-            with p.open(encoding="utf-8") as fh:
-                return list(csv.DictReader(fh))
-        if p.suffix.lower() == ".json":
-            return json.loads(p.read_text(encoding="utf-8"))
-        if p.suffix.lower() in {".md", ".markdown"}:
-            return _parse_md_guide(p)
-        return []
+        rows = _load_guide_file(str(path), os.stat(path).st_mtime_ns)
     except Exception:
         return []
+    # Copy the rows so callers cannot modify the cached entries.
+    return [dict(r) if isinstance(r, dict) else r for r in rows]
 
 
 def prompts_for_pdf(pdf_name: str) -> str:
@@ -1,4 +1,7 @@
+import atexit
 import logging
+import os
+import threading
 from pathlib import Path
 from typing import List, Dict, Any
 
@@ -9,6 +12,9 @@ except Exception:  # pragma: no cover - fallback when tiktoken missing
         def encode(self, text: str) -> list[str]:
             return text.split()
 
+        def encode_batch(self, texts: list[str], **_kwargs) -> list[list[str]]:
+            return [self.encode(t) for t in texts]
+
     class _Stub:
         def encoding_for_model(self, _model: str) -> _SimpleTok:
             return _SimpleTok()
@@ -21,45 +27,103 @@ from smart_price import config
 
 logger = logging.getLogger("smart_price")
 
+_TOKEN_LOG_LOCK = threading.Lock()
+_TOKEN_LOG_FH = None
+_TOKEN_LOG_PATH: Path | None = None
+
+
+_ENC_POOL: dict[str, Any] = {}
+_ENC_LOCK = threading.Lock()
+
+# ``encode_batch`` starts a thread pool per call, which only pays off once
+# there are enough strings to spread over the threads.
+_BATCH_MIN_STRINGS = 32
+
+
+def _enc_for(model: str):
+    """Return the tiktoken encoder for ``model``, shared by all threads.
+
+    Encoders are built under a lock so concurrent first calls load the BPE
+    ranks only once per process.
+    """
+    enc = _ENC_POOL.get(model)
+    if enc is None:
+        with _ENC_LOCK:
+            enc = _ENC_POOL.get(model)
+            if enc is None:
+                try:
+                    enc = tiktoken.encoding_for_model(model)
+                except Exception:
+                    enc = tiktoken.get_encoding("cl100k_base")
+                _ENC_POOL[model] = enc
+    return enc
+
 
 def num_tokens_from_text(text: str, model: str) -> int:
     """Return number of tokens in ``text`` for ``model``."""
-    try:
-        enc = tiktoken.encoding_for_model(model)
-    except Exception:
-        enc = tiktoken.get_encoding("cl100k_base")
+    enc = _enc_for(model)
     return len(enc.encode(text or ""))
 
 
 def num_tokens_from_messages(messages: List[Dict[str, Any]], model: str) -> int:
     """Return number of tokens used by a list of chat ``messages``."""
-    try:
-        enc = tiktoken.encoding_for_model(model)
-    except Exception:
-        enc = tiktoken.get_encoding("cl100k_base")
-
+    enc = _enc_for(model)
     tokens_per_message = 3
     tokens_per_name = 1
-    num_tokens = 0
+    strings: list[str] = []
+    names = 0
     for message in messages:
-        num_tokens += tokens_per_message
         for key, value in message.items():
             if value is None:
                 continue
-            num_tokens += len(enc.encode(str(value)))
+            strings.append(str(value))
             if key == "name":
-                num_tokens += tokens_per_name
+                names += 1
+    if len(strings) >= _BATCH_MIN_STRINGS and hasattr(enc, "encode_batch"):
+        threads = min(len(strings), os.cpu_count() or 1)
+        encoded = enc.encode_batch(strings, num_threads=threads)
+    else:
+        encoded = [enc.encode(s) for s in strings]
+    num_tokens = tokens_per_message * len(messages)
+    num_tokens += sum(map(len, encoded)) + tokens_per_name * names
     num_tokens += 3
     return num_tokens
 
 
+def _close_token_log() -> None:
+    global _TOKEN_LOG_FH, _TOKEN_LOG_PATH
+    with _TOKEN_LOG_LOCK:
+        if _TOKEN_LOG_FH is not None:
+            _TOKEN_LOG_FH.close()
+        _TOKEN_LOG_FH, _TOKEN_LOG_PATH = None, None
+
+
+atexit.register(_close_token_log)
+
+
+def _get_token_log():
+    """Return the append handle for ``token_log.txt``, opening it lazily.
+
+    Must be called with ``_TOKEN_LOG_LOCK`` held. The handle is line
+    buffered so every entry reaches the file as soon as it is written, and it
+    is reopened when :data:`config.LOG_PATH` points somewhere else.
+    """
+    global _TOKEN_LOG_FH, _TOKEN_LOG_PATH
+    path = Path(config.LOG_PATH).with_name("token_log.txt")
+    if _TOKEN_LOG_FH is None or _TOKEN_LOG_PATH != path:
+        fh = open(path, "a", encoding="utf-8", buffering=1)
+        if _TOKEN_LOG_FH is not None:
+            _TOKEN_LOG_FH.close()
+        _TOKEN_LOG_FH, _TOKEN_LOG_PATH = fh, path
+    return _TOKEN_LOG_FH
+
+
 def log_token_counts(pdf_name: str, input_tokens: int, output_tokens: int) -> None:
     """Append token statistics for ``pdf_name`` to ``token_log.txt``."""
-    log_file = Path(config.LOG_PATH).with_name("token_log.txt")
     line = f"{pdf_name}\tinput:{input_tokens}\toutput:{output_tokens}\ttotal:{input_tokens + output_tokens}\n"
     try:
-        with open(log_file, "a", encoding="utf-8") as fh:
-            fh.write(line)
+        with _TOKEN_LOG_LOCK:
+            _get_token_log().write(line)
     except Exception as exc:  # pragma: no cover - log errors
         logger.error("Token log write failed: %s", exc)
     logger.info(
@@ -69,6 +133,3 @@ def log_token_counts(pdf_name: str, input_tokens: int, output_tokens: int) -> No
         output_tokens,
         input_tokens + output_tokens,
     )
-    print(
-        f"{pdf_name} tokens -> input: {input_tokens}, output: {output_tokens}, total: {input_tokens + output_tokens}"
-    )
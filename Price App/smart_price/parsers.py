@@ -7,10 +7,10 @@ import re
 
 from .core.extract_excel import find_columns_in_excel
 from .core.common_utils import (
-    normalize_price,
-    detect_currency,
+    normalize_price_series,
+    detect_currency_series,
     detect_brand,
-    normalize_currency,
+    normalize_currency_series,
 )
 
 
@@ -58,8 +58,8 @@ def parse_df(df: pd.DataFrame) -> pd.DataFrame:
     data.rename(columns=mapping, inplace=True)
 
     if "Para_Birimi" not in data.columns:
-        data["Para_Birimi"] = data["Fiyat_Ham"].astype(str).apply(detect_currency)
-    data["Para_Birimi"] = data["Para_Birimi"].apply(normalize_currency)
+        data["Para_Birimi"] = detect_currency_series(data["Fiyat_Ham"].astype(str))
+    data["Para_Birimi"] = normalize_currency_series(data["Para_Birimi"])
     data["Para_Birimi"] = data["Para_Birimi"].fillna("₺")
 
     year_match = None
@@ -73,7 +73,7 @@ def parse_df(df: pd.DataFrame) -> pd.DataFrame:
     data["Sayfa"] = None
 
     result = data.copy()
-    result["Fiyat"] = result["Fiyat_Ham"].apply(normalize_price)
+    result["Fiyat"] = normalize_price_series(result["Fiyat_Ham"])
     if "Kisa_Kod" not in result.columns:
         result["Kisa_Kod"] = None
     if "Malzeme_Kodu" not in result.columns:
@@ -1,20 +1,43 @@
+from __future__ import annotations
+
 import argparse
 import csv
 import os
-import sqlite3
+import re
 import logging
-import pandas as pd
 import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 
 from smart_price import config
-from smart_price.core.extract_excel import extract_from_excel
-from smart_price.core.extract_pdf import extract_from_pdf
 
 from smart_price.core.logger import init_logging
 
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import pandas as pd
+
 logger = logging.getLogger("smart_price")
 
+_PAGE_RE = re.compile(r"(\d+)\s*(?:-\s*(\d+))?")
+
+
+# pandas, OpenAI and the PDF stack take over a second to import, so the
+# extractors are loaded on first use and ``--show-log`` starts instantly.
+def extract_from_excel(*args, **kwargs):
+    """Proxy for :func:`smart_price.core.extract_excel.extract_from_excel`."""
+    from smart_price.core.extract_excel import extract_from_excel as _extract
+
+    return _extract(*args, **kwargs)
+
+
+def extract_from_pdf(*args, **kwargs):
+    """Proxy for :func:`smart_price.core.extract_pdf.extract_from_pdf`."""
+    from smart_price.core.extract_pdf import extract_from_pdf as _extract
+
+    return _extract(*args, **kwargs)
+
 
 def _configure_poppler() -> None:
     """Ensure bundled Poppler binaries are on ``PATH``."""
@@ -29,26 +52,75 @@ def _configure_poppler() -> None:
 def _parse_page_range(spec: str) -> list[int]:
     """Return list of page numbers defined by ``spec``."""
     pages: set[int] = set()
-    for part in spec.split(','):
-        part = part.strip()
-        if not part:
+    for part in spec.split(","):
+        match = _PAGE_RE.fullmatch(part.strip())
+        if not match:
             continue
-        if '-' in part:
-            start_s, end_s = part.split('-', 1)
-            try:
-                start = int(start_s)
-                end = int(end_s)
-            except ValueError:
-                continue
-            pages.update(range(start, end + 1))
-        else:
-            try:
-                pages.add(int(part))
-            except ValueError:
-                continue
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else start
+        pages.update(range(start, end + 1))
     return sorted(pages)
 
 
+def _extract_file(path: str, page_range: list[int] | None) -> dict | None:
+    """Extract ``path`` and return its log row with the data under ``"df"``.
+
+    ``None`` is returned for unsupported file types. Runs in a worker
+    process when several files are given; those exit without running
+    ``atexit`` handlers, so the token log is closed before returning.
+    """
+    name = os.path.basename(path)
+    ext = os.path.splitext(name)[1].lower()
+    try:
+        if ext in ('.xlsx', '.xls'):
+            df = extract_from_excel(path)
+        elif ext == '.pdf':
+            df = extract_from_pdf(path, page_range=page_range)
+        else:
+            logger.info("Skipping unsupported file: %s", name)
+            return None
+    except Exception as exc:  # pragma: no cover - unexpected errors
+        logger.error("Error processing %s: %s", name, exc)
+        return {'file': name, 'format': ext.lstrip('.'), 'rows': 0, 'error': str(exc), 'df': None}
+    finally:
+        from smart_price.core.token_utils import _close_token_log
+
+        _close_token_log()
+    return {'file': name, 'format': ext.lstrip('.'), 'rows': len(df), 'error': '', 'df': df}
+
+
+def _iter_extracted(paths: list[str], page_range: list[int] | None):
+    """Yield :func:`_extract_file` results for ``paths`` in input order.
+
+    Several files are extracted in a process pool. Results keep input order
+    so duplicate handling does not depend on completion order.
+    """
+    workers = min(len(paths), os.cpu_count() or 1)
+    if workers <= 1:
+        for path in paths:
+            yield _extract_file(path, page_range)
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_logging,
+        initargs=(config.LOG_PATH,),
+    ) as pool:
+        yield from pool.map(_extract_file, paths, [page_range] * len(paths))
+
+
+def _spill(df: pd.DataFrame, directory: str, idx: int) -> pd.DataFrame | str:
+    """Write ``df`` to a Parquet shard in ``directory`` and return its path.
+
+    The frame itself is returned when it cannot be written, for example
+    without a Parquet engine or with mixed-type object columns.
+    """
+    path = os.path.join(directory, f"{idx:05d}.parquet")
+    try:
+        df.to_parquet(path, index=False)
+    except Exception as exc:
+        logger.debug("Keeping extracted rows in memory: %s", exc)
+        return df
+    return path
 
 
 def parse_args() -> argparse.Namespace:
@@ -97,6 +169,12 @@ def main() -> None:
         except FileNotFoundError:
             print(f"Log file not found: {log_file}")
         return
+    import sqlite3
+
+    import pandas as pd
+
+    from smart_price.core.price_db import write_prices_table
+
     _configure_poppler()
     pages_arg = getattr(args, "pages", None)
     if pages_arg and pages_arg.strip().lower() != "all":
@@ -106,118 +184,40 @@ def main() -> None:
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
     os.makedirs(os.path.dirname(args.db), exist_ok=True)
     os.makedirs(os.path.dirname(args.log), exist_ok=True)
-    all_extracted = []
+    # Extracted rows are spilled to Parquet shards as each file finishes so
+    # only the final master frame has to fit in memory.
+    parts: list[pd.DataFrame | str] = []
     log_rows = []
-    for path in args.files:
-        name = os.path.basename(path)
-        ext = os.path.splitext(name)[1].lower()
-        try:
-            if ext in ('.xlsx', '.xls'):
-                df = extract_from_excel(path)
-            elif ext == '.pdf':
-                df = extract_from_pdf(path, page_range=page_range)
-            else:
-                logger.info("Skipping unsupported file: %s", name)
+    spill_dir = tempfile.mkdtemp(prefix="smart_price_extract_")
+    try:
+        for idx, result in enumerate(_iter_extracted(list(args.files), page_range)):
+            if result is None:
                 continue
-            row_count = len(df)
-            if row_count:
-                logger.info("%s: %d records", name, row_count)
-                all_extracted.append(df)
-            else:
-                logger.info("%s: no data found", name)
-            log_rows.append({'file': name, 'format': ext.lstrip('.'), 'rows': row_count, 'error': ''})
-        except Exception as exc:  # pragma: no cover - unexpected errors
-            logger.error("Error processing %s: %s", name, exc)
-            log_rows.append({'file': name, 'format': ext.lstrip('.'), 'rows': 0, 'error': str(exc)})
-    if not all_extracted:
-        logger.info("No data extracted from given files.")
-        return
-    master = pd.concat(all_extracted, ignore_index=True)
-    master.drop_duplicates(subset=["Malzeme_Kodu", "Fiyat"], keep="last", inplace=True)
+            df = result.pop('df')
+            if result['rows']:
+                logger.info("%s: %d records", result['file'], result['rows'])
+                parts.append(_spill(df, spill_dir, idx))
+            elif not result['error']:
+                logger.info("%s: no data found", result['file'])
+            log_rows.append(result)
+            del df
+        if not parts:
+            logger.info("No data extracted from given files.")
+            return
+        master = pd.concat(
+            [pd.read_parquet(p) if isinstance(p, str) else p for p in parts],
+            ignore_index=True,
+        )
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+    keep = ~master.duplicated(subset=["Malzeme_Kodu", "Fiyat"], keep="last").to_numpy()
+    master = master[keep]
     master.sort_values(by="Açıklama", inplace=True)
     master.to_excel(args.output, index=False)
     logger.info("Saved %d records to %s", len(master), args.output)
 
     conn = sqlite3.connect(args.db)
-    with conn:
-        conn.execute(
-            """CREATE TABLE IF NOT EXISTS prices (
-            material_code TEXT,
-            description TEXT,
-            price REAL,
-            unit TEXT,
-            box_count TEXT,
-            price_currency TEXT,
-            source_file TEXT,
-            source_page INTEGER,
-            image_path TEXT,
-            record_code TEXT,
-            year INTEGER,
-            brand TEXT,
-            main_header TEXT,
-            sub_header TEXT,
-            category TEXT
-            )"""
-        )
-        master.rename(
-            columns={
-                "Malzeme_Kodu": "material_code",
-                "Açıklama": "description",
-                "Fiyat": "price",
-                "Birim": "unit",
-                "Kutu_Adedi": "box_count",
-                "Para_Birimi": "price_currency",
-                "Kaynak_Dosya": "source_file",
-                "Sayfa": "source_page",
-                "Image_Path": "image_path",
-                "Record_Code": "record_code",
-                "Yil": "year",
-                "Marka": "brand",
-                "Ana_Baslik": "main_header",
-                "Alt_Baslik": "sub_header",
-                "Kategori": "category",
-            },
-            inplace=True,
-        )
-        for col in [
-            "material_code",
-            "description",
-            "price",
-            "unit",
-            "box_count",
-            "price_currency",
-            "source_file",
-            "source_page",
-            "image_path",
-            "record_code",
-            "year",
-            "brand",
-            "main_header",
-            "sub_header",
-            "category",
-        ]:
-            if col not in master.columns:
-                master[col] = None
-        master = master[
-            [
-                "material_code",
-                "description",
-                "price",
-                "unit",
-                "box_count",
-                "price_currency",
-                "source_file",
-                "source_page",
-                "image_path",
-            "record_code",
-            "year",
-            "brand",
-            "main_header",
-            "sub_header",
-            "category",
-        ]
-        ]
-        master.to_sql("prices", conn, if_exists="replace", index=False)
+    write_prices_table(conn, master)
     conn.close()
     logger.info("Database written to %s", args.db)
 
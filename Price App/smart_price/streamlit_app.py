@@ -1,11 +1,13 @@
 import os
+import hashlib
 import io
 import logging
 import shutil
 import sqlite3
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Optional
+from typing import IO, Callable, Optional
 
 import base64
 import pandas as pd
@@ -26,7 +28,12 @@ from smart_price.core.extract_pdf_agentic import extract_from_pdf_agentic
 from smart_price import config
 from smart_price.core.logger import init_logging
 from smart_price.core.github_upload import upload_folder, delete_github_folder
-from smart_price.core.common_utils import normalize_currency, normalize_price
+from smart_price.core.price_db import write_prices_table
+from smart_price.core.common_utils import (
+    file_to_base64,
+    normalize_currency_series,
+    normalize_price_series,
+)
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".env"))
 load_dotenv(dotenv_path=project_root)
@@ -81,8 +88,7 @@ def big_alert(message: str, *, level: str = "info", icon: str | None = None) ->
 
     import streamlit as st
     if icon:
-        with open(icon, "rb") as img_file:
-            icon_b64 = base64.b64encode(img_file.read()).decode("utf-8")
+        icon_b64 = file_to_base64(icon)
     else:
         icon_b64 = icons.ICONS.get(level, icons.INFO_ICON_B64)
 
@@ -212,13 +218,25 @@ def inject_style() -> None:
 
 
 
+@lru_cache(maxsize=4)
+def _which(name: str) -> str | None:
+    """Return :func:`shutil.which` for ``name``, cached for the process."""
+    return shutil.which(name)
+
+
 def _configure_poppler() -> None:
-    """Ensure bundled Poppler binaries are on ``PATH``."""
-    if shutil.which("pdftoppm"):
+    """Ensure bundled Poppler binaries are on ``PATH``.
+
+    Called on every Streamlit rerun, so the ``PATH`` lookup is cached and the
+    bundled folder is only prepended once.
+    """
+    if _which("pdftoppm"):
         return
-    os.environ["PATH"] = os.pathsep.join(
-        [str(config.POPPLER_PATH), os.environ.get("PATH", "")]
-    )
+    poppler = str(config.POPPLER_PATH)
+    path = os.environ.get("PATH", "")
+    if poppler in path.split(os.pathsep):
+        return
+    os.environ["PATH"] = os.pathsep.join([poppler, path])
 
 
 def resource_path(relative: str) -> str:
@@ -232,15 +250,49 @@ def get_master_dataset_path() -> str:
     return str(config.MASTER_EXCEL_PATH)
 
 
+def _master_parquet_path() -> Path:
+    """Return the Parquet copy of the master Excel file.
+
+    It lives under :data:`config.CACHE_DIR` rather than next to the Excel
+    file so the ``Master_data_base`` upload does not push a second copy of
+    the dataset. The name includes a hash of the Excel path so different
+    masters never share a copy.
+    """
+    excel = Path(config.MASTER_EXCEL_PATH)
+    digest = hashlib.sha1(str(excel.resolve()).encode()).hexdigest()[:12]
+    return Path(config.CACHE_DIR) / "masters" / f"{excel.stem}-{digest}.parquet"
+
+
+def _read_master(excel_path: str) -> pd.DataFrame:
+    """Load the master dataset, preferring its Parquet copy when current.
+
+    The Parquet file is only used when it is at least as new as the Excel
+    file, so a master replaced by hand is still read from Excel.
+    """
+    parquet_path = _master_parquet_path()
+    try:
+        if parquet_path.stat().st_mtime >= os.path.getmtime(excel_path):
+            return pd.read_parquet(parquet_path)
+    except FileNotFoundError:
+        pass
+    except Exception as exc:  # pragma: no cover - unreadable parquet
+        logger.warning("Failed to read master parquet: %s", exc)
+    return pd.read_excel(excel_path)
+
+
 def extract_from_excel_file(
-    file: io.BytesIO, *, file_name: str | None = None
+    file: IO[bytes], *, file_name: str | None = None
 ) -> pd.DataFrame:
-    """Wrapper around :func:`smart_price.core.extract_excel.extract_from_excel`."""
+    """Wrapper around :func:`smart_price.core.extract_excel.extract_from_excel`.
+
+    ``file`` may be the uploaded stream itself; callers must not move its
+    position while extraction runs.
+    """
     return extract_from_excel(file, filename=file_name)
 
 
 def extract_from_pdf_file(
-    file: io.BytesIO,
+    file: IO[bytes],
     *,
     file_name: str | None = None,
     status_log: Optional[Callable[[str, str], None]] = None,
@@ -252,7 +304,8 @@ def extract_from_pdf_file(
     Parameters
     ----------
     file:
-        PDF data as ``io.BytesIO``.
+        PDF data as a binary stream such as Streamlit's ``UploadedFile``.
+        Callers must not move its position while extraction runs.
     file_name:
         Optional file name used for logging/debugging.
     status_log:
@@ -329,7 +382,13 @@ def merge_files(
                 )
 
         name = up_file.name.lower()
-        bytes_data = io.BytesIO(up_file.read())
+        if hasattr(up_file, "seek"):
+            # Streamlit's UploadedFile is already an in-memory binary stream;
+            # the extractors seek it themselves, so no second copy is made.
+            up_file.seek(0)
+            bytes_data = up_file
+        else:
+            bytes_data = io.BytesIO(up_file.read())
         if update_status:
             update_status("Veri ay\u0131klan\u0131yor...", "info")
         df = pd.DataFrame()
@@ -413,7 +472,7 @@ def merge_files(
     master = standardize_column_names(master)
     logger.debug("[merge] Raw merged rows: %d", len(master))
     if "Fiyat" in master.columns:
-        master["Fiyat"] = master["Fiyat"].apply(normalize_price)
+        master["Fiyat"] = normalize_price_series(master["Fiyat"])
     else:
         logger.warning("[merge] 'Fiyat' column missing after merge; columns: %s", list(master.columns))
         master["Fiyat"] = pd.NA
@@ -426,20 +485,30 @@ def merge_files(
         f"[merge] DF Malzeme_Kodu sample: "
         f"{master['Malzeme_Kodu'].dropna().head(5).tolist() if 'Malzeme_Kodu' in master.columns else 'COLUMN NOT FOUND'}"
     )
-    drop_mask = master[["Malzeme_Kodu", "Fiyat"]].isna().any(axis=1)
-    dropped_preview = master[drop_mask].head().to_dict(orient="records")
+    # One boolean pass over both key columns, reused for the preview and the
+    # filter. Slicing returns a new frame, so the unfiltered one stays
+    # available for the diagnostics below without an up-front deep copy.
+    drop_mask = (
+        master["Malzeme_Kodu"].isna().to_numpy()
+        | master["Fiyat"].isna().to_numpy()
+    )
     before_len = len(master)
-    before_master = master.copy()
-    master.dropna(subset=["Malzeme_Kodu", "Fiyat"], inplace=True)
+    before_master = master
+    master = master[~drop_mask]
     logger.debug(
         "[merge] Filter sonrası: %d satır (drop edilen: %d satır)",
         len(master),
         before_len - len(master),
     )
-    if before_len != len(master):
+    if before_len != len(master) and logger.isEnabledFor(logging.DEBUG):
         logger.debug("[merge] Drop nedeni: subset=['Malzeme_Kodu', 'Fiyat']")
-        logger.debug("[merge] Drop edilen ilk 5 satır: %s", dropped_preview)
+        logger.debug(
+            "[merge] Drop edilen ilk 5 satır: %s",
+            before_master[drop_mask].head().to_dict(orient="records"),
+        )
     if master.empty and before_len > 0 and before_master["Malzeme_Kodu"].isna().all():
+        # Every row was dropped, so the preview is simply the first rows.
+        dropped_preview = before_master.head().to_dict(orient="records")
         sources = (
             before_master.get("Kaynak_Dosya", pd.Series(dtype=str))
             .dropna()
@@ -507,12 +576,12 @@ def save_master_dataset(
     os.makedirs(os.path.dirname(excel_path), exist_ok=True)
     if "Para_Birimi" not in df.columns:
         df["Para_Birimi"] = None
-    df["Para_Birimi"] = df["Para_Birimi"].apply(normalize_currency)
+    df["Para_Birimi"] = normalize_currency_series(df["Para_Birimi"])
     df["Para_Birimi"] = df["Para_Birimi"].fillna("₺")
     existing = pd.DataFrame()
     if os.path.exists(excel_path):
         try:
-            existing = pd.read_excel(excel_path)
+            existing = _read_master(excel_path)
         except Exception as exc:  # pragma: no cover - read failures
             logger.error("Failed to read master dataset: %s", exc)
             existing = pd.DataFrame()
@@ -539,71 +608,18 @@ def save_master_dataset(
 
     merged = pd.concat([existing, df], ignore_index=True)
     merged.to_excel(excel_path, index=False)
+    parquet_path = _master_parquet_path()
+    try:
+        parquet_path.parent.mkdir(parents=True, exist_ok=True)
+        merged.to_parquet(parquet_path, compression="zstd", index=False)
+    except Exception as exc:
+        # Mixed-type columns or a missing engine; drop any stale copy so the
+        # next save reads the Excel file instead.
+        logger.warning("Master parquet write failed: %s", exc)
+        parquet_path.unlink(missing_ok=True)
 
     conn = sqlite3.connect(db_path)
-    with conn:
-        conn.execute(
-            """CREATE TABLE IF NOT EXISTS prices (
-            material_code TEXT,
-            description TEXT,
-            price REAL,
-            unit TEXT,
-            box_count TEXT,
-            price_currency TEXT,
-            source_file TEXT,
-            source_page INTEGER,
-            image_path TEXT,
-            record_code TEXT,
-            year INTEGER,
-            brand TEXT,
-            main_header TEXT,
-            sub_header TEXT,
-            category TEXT
-            )"""
-        )
-        db_df = merged.copy()
-        db_df.rename(
-            columns={
-                "Malzeme_Kodu": "material_code",
-                "Açıklama": "description",
-                "Fiyat": "price",
-                "Birim": "unit",
-                "Kutu_Adedi": "box_count",
-                "Para_Birimi": "price_currency",
-                "Kaynak_Dosya": "source_file",
-                "Sayfa": "source_page",
-                "Image_Path": "image_path",
-                "Record_Code": "record_code",
-                "Yil": "year",
-                "Marka": "brand",
-                "Ana_Baslik": "main_header",
-                "Alt_Baslik": "sub_header",
-                "Kategori": "category",
-            },
-            inplace=True,
-        )
-        columns = [
-            "material_code",
-            "description",
-            "price",
-            "unit",
-            "box_count",
-            "price_currency",
-            "source_file",
-            "source_page",
-            "image_path",
-            "record_code",
-            "year",
-            "brand",
-            "main_header",
-            "sub_header",
-            "category",
-        ]
-        for col in columns:
-            if col not in db_df.columns:
-                db_df[col] = None
-        db_df = db_df[columns]
-        db_df.to_sql("prices", conn, if_exists="replace", index=False)
+    write_prices_table(conn, merged)
     conn.close()
 
     upload_ok = upload_folder(
@@ -635,6 +651,10 @@ def reset_database() -> None:
             config.MASTER_EXCEL_PATH.unlink()
         except Exception:
             pass
+    try:
+        _master_parquet_path().unlink(missing_ok=True)
+    except Exception:
+        pass
 
     delete_github_folder("LLM_Output_db")
     delete_github_folder("Master_data_base")
@@ -709,7 +729,8 @@ def upload_page():
 
         st.session_state["processed_df"] = df
         st.metric("Rows", len(df))
-        coverage = df["Malzeme_Kodu"].notna().mean()
+        # ``count`` skips missing values without building a boolean mask.
+        coverage = df["Malzeme_Kodu"].count() / len(df)
         st.metric("Code filled %", f"{coverage:.1%}")
         if coverage < MIN_CODE_RATIO:
             big_alert("Low code coverage – OCR/LLM suggested", level="error")
@@ -719,7 +740,10 @@ def upload_page():
             st.info(f"Toplam Token: {token_total}")
             details = getattr(df, "token_totals", {})
             for fname, vals in details.items():
-                st.write(f"{fname}: input {vals.get('input',0)}, output {vals.get('output',0)}")
+                st.write(
+                    f"{fname}: input {vals.get('input',0)} (cached {vals.get('cached',0)}), "
+                    f"output {vals.get('output',0)}"
+                )
 
     if st.session_state.get("processed_df") is not None and st.button(
         "Master Veriyi Kaydet"
@@ -19,11 +19,11 @@ def img_to_base64(path: Union[Path, str]) -> str:
         resp = requests.get(str(path))
         resp.raise_for_status()
         data = resp.content
-    else:
-        with open(Path(path), "rb") as img_file:
-            data = img_file.read()
+        return base64.b64encode(data).decode("utf-8")
 
-    return base64.b64encode(data).decode("utf-8")
+    from .core.common_utils import file_to_base64
+
+    return file_to_base64(Path(path))
 
 
 def logo_overlay(
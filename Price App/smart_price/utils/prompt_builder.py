@@ -12,7 +12,7 @@ import re
 import unicodedata
 import os
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 def _resolve_guide_path() -> Path:
     """Return extraction guide path using environment and sensible fallbacks."""
@@ -48,6 +48,7 @@ class _GuideCache:
         self.synonym_block = ""
         self.generic_block = ""
         self.brand_blocks: Dict[str, str] = {}
+        self.brand_slugs: List[Tuple[str, str]] = []
         self.default_block = ""
         self._loaded = False
 
@@ -65,6 +66,8 @@ class _GuideCache:
         pattern = re.compile(r"###\s*3\.\d+\s+([^\n]+)\n([\s\S]+?)(?=\n###\s*3\.|\n##\s*4\s*·|\Z)")
         for m in pattern.finditer(text):
             self.brand_blocks[m[1].strip()] = m[2].strip()
+        # Slug every brand once; lookups then only slug the file name.
+        self.brand_slugs = [(_slug(b), b) for b in self.brand_blocks]
         self.default_block = self._section(text, r"##\s*4[\s\S]+?\n---\n")
         self._loaded = True
 
@@ -83,16 +86,22 @@ def _slug(t: str) -> str:
     t = unicodedata.normalize("NFKD", t).encode("ascii","ignore").decode()
     return re.sub(r"[^a-z0-9]", "", t.lower())
 
-def _match_brand(pdf: str, blocks: Dict[str,str]) -> Tuple[str,str]:
+def _match_brand(pdf: str, g: _GuideCache) -> Tuple[str,str]:
     stem = _slug(Path(pdf).stem)
-    for brand, body in blocks.items():
-        if _slug(brand) in stem:
-            return brand, body
+    for slug, brand in g.brand_slugs:
+        if slug in stem:
+            return brand, g.brand_blocks[brand]
     return "DEFAULT", ""
 
 def get_prompt_for_file(pdf_name: str) -> str:
+    # Only the file name decides the brand, so cache on it rather than on
+    # the (often temporary) full path.
+    return _prompt_for_name(Path(pdf_name).name)
+
+@functools.lru_cache(maxsize=256)
+def _prompt_for_name(pdf_name: str) -> str:
     g = _guide()
-    brand, body = _match_brand(pdf_name, g.brand_blocks)
+    brand, body = _match_brand(pdf_name, g)
     parts = [
         g.global_block,
         g.synonym_block,
@@ -337,3 +337,40 @@ def test_agentic_no_rows_logged(monkeypatch, caplog):
     assert "no rows extracted" in messages
     assert "preview=" in messages
     assert "page_summary" in messages
+
+
+@pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
+def test_agentic_multiple_documents(monkeypatch):
+    header = ["Malzeme_Kodu", "Açıklama", "Fiyat"]
+
+    def make_doc(data):
+        return types.SimpleNamespace(
+            chunks=[
+                types.SimpleNamespace(chunk_type="table_row", text="\t".join(header)),
+                types.SimpleNamespace(chunk_type="table_row", text="\t".join(data)),
+            ],
+            page_summary=None,
+            token_counts=None,
+        )
+
+    docs = [make_doc(["A1", "First", "1"]), make_doc(["B2", "Second", "2"])]
+
+    parse_mod = types.ModuleType("agentic_doc.parse")
+    parse_mod.parse = lambda *_a, **_kw: docs
+    common_mod = types.ModuleType("agentic_doc.common")
+    common_mod.RetryableError = Exception
+    agentic_pkg = types.ModuleType("agentic_doc")
+    agentic_pkg.__path__ = []
+    agentic_pkg.parse = parse_mod
+    agentic_pkg.common = common_mod
+    monkeypatch.setitem(sys.modules, "agentic_doc", agentic_pkg)
+    monkeypatch.setitem(sys.modules, "agentic_doc.parse", parse_mod)
+    monkeypatch.setitem(sys.modules, "agentic_doc.common", common_mod)
+
+    mod = importlib.import_module("smart_price.core.extract_pdf_agentic")
+    importlib.reload(mod)
+
+    df = mod.extract_from_pdf_agentic("dummy.pdf")
+    assert df["Malzeme_Kodu"].tolist() == ["A1", "B2"]
+    assert df["Fiyat"].tolist() == [1.0, 2.0]
+    assert list(df.index) == [0, 1]
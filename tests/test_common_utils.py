@@ -1,7 +1,69 @@
 
-from smart_price.core.common_utils import safe_json_parse
+import io
+import os
+import sys
+import types
+
+from smart_price.core.common_utils import (
+    load_env_once,
+    safe_json_parse,
+    spool_to_tempfile,
+    remove_tempfile,
+)
 
 
 def test_safe_json_parse_ellipsis():
     assert safe_json_parse("...") is None
 
+
+def test_safe_json_parse_with_and_without_orjson(monkeypatch):
+    import smart_price.core.common_utils as cu
+
+    text = '[{"Fiyat": "1,5", "Açıklama": "Ürün"}]'
+    fast = safe_json_parse(text)
+    monkeypatch.setattr(cu, "_orjson", None)
+    assert safe_json_parse(text) == fast == [{"Fiyat": "1,5", "Açıklama": "Ürün"}]
+    assert safe_json_parse("{'a': 1}") == {"a": 1}
+
+
+
+def test_spool_to_tempfile_streams_buffer():
+    import smart_price.core.common_utils as cu
+
+    data = b"%PDF" + os.urandom(3 << 20)
+    path = spool_to_tempfile(io.BytesIO(data), suffix=".pdf")
+    try:
+        assert path.endswith(".pdf")
+        with open(path, "rb") as fh:
+            assert fh.read() == data
+        assert path in cu._SPOOLED
+    finally:
+        remove_tempfile(path)
+    assert not os.path.exists(path)
+    assert path not in cu._SPOOLED
+
+
+def test_load_env_once(monkeypatch):
+    calls = []
+    stub = types.ModuleType("dotenv")
+    stub.find_dotenv = lambda: calls.append("find") or "/tmp/.env"
+    stub.load_dotenv = lambda dotenv_path=None: calls.append(dotenv_path)
+    monkeypatch.setitem(sys.modules, "dotenv", stub)
+    monkeypatch.delenv("_SMART_PRICE_DOTENV_LOADED", raising=False)
+
+    load_env_once()
+    load_env_once()
+    assert calls == ["find", "/tmp/.env"]
+
+
+def test_file_to_base64(tmp_path):
+    import base64
+    from smart_price.core.common_utils import file_to_base64
+
+    data = os.urandom(100_001)
+    f = tmp_path / "img.jpg"
+    f.write_bytes(data)
+    assert file_to_base64(f) == base64.b64encode(data).decode("ascii")
+    empty = tmp_path / "empty.jpg"
+    empty.write_bytes(b"")
+    assert file_to_base64(empty) == ""
@@ -1,13 +1,18 @@
 import logging
 import base64
+import hashlib
+import json
+import types
 from urllib import error
 import pytest
+import requests
 
 from smart_price.core.github_upload import (
     _sanitize_repo_path,
     upload_folder,
     delete_github_folder,
     _api_request,
+    _read_base64,
 )
 
 
@@ -23,6 +28,16 @@ def test_sanitize_repo_path():
     )
 
 
+def test_read_base64(tmp_path):
+    data = bytes(range(256)) * 10
+    f = tmp_path / "img.jpg"
+    f.write_bytes(data)
+    assert _read_base64(f) == base64.b64encode(data).decode("ascii")
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    assert _read_base64(empty) == ""
+
+
 def test_upload_folder_encodes_url(tmp_path, monkeypatch):
     folder = tmp_path / "Omega Motor Tüm"
     folder.mkdir()
@@ -47,10 +62,167 @@ def test_upload_folder_encodes_url(tmp_path, monkeypatch):
     assert "%20" not in calls[0]
 
 
+def test_upload_folder_parallel(tmp_path, monkeypatch):
+    folder = tmp_path / "many"
+    folder.mkdir()
+    for i in range(5):
+        (folder / f"page_{i}.txt").write_text(str(i))
+
+    puts = []
+
+    def fake_api(method, url, token, data=None, timeout=None):
+        if method == "PUT":
+            puts.append(url)
+        return {}
+
+    monkeypatch.setattr(
+        "smart_price.core.github_upload._api_request", fake_api
+    )
+    monkeypatch.setenv("GITHUB_REPO", "owner/repo")
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    monkeypatch.setenv("GITHUB_UPLOAD_WORKERS", "3")
+
+    assert upload_folder(folder, remote_prefix="LLM_Output_db/many")
+    assert sorted(u.rsplit("/", 1)[-1] for u in puts) == [
+        f"page_{i}.txt" for i in range(5)
+    ]
+
+
+def test_upload_folder_single_commit(tmp_path, monkeypatch):
+    folder = tmp_path / "Omega Motor"
+    folder.mkdir()
+    (folder / "a.txt").write_text("a")
+    (folder / "b.txt").write_text("b")
+
+    calls = []
+
+    def fake_api(method, url, token, data=None, timeout=None):
+        calls.append((method, url.rsplit("/git/", 1)[-1], data))
+        if url.endswith("/git/ref/heads/main"):
+            return {"object": {"sha": "head"}}
+        if url.endswith("/git/commits/head"):
+            return {"tree": {"sha": "base"}}
+        if url.endswith("/git/blobs"):
+            return {"sha": "blob-" + base64.b64decode(data["content"]).decode()}
+        if url.endswith("/git/trees"):
+            return {"sha": "tree"}
+        if url.endswith("/git/commits"):
+            return {"sha": "commit"}
+        return {}
+
+    monkeypatch.setattr(
+        "smart_price.core.github_upload._api_request", fake_api
+    )
+    monkeypatch.setenv("GITHUB_REPO", "owner/repo")
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+
+    assert upload_folder(folder)
+
+    methods = [(m, u) for m, u, _ in calls]
+    assert methods[:2] == [("GET", "ref/heads/main"), ("GET", "commits/head")]
+    assert methods[2:4] == [("POST", "blobs")] * 2
+    assert methods[4:] == [
+        ("POST", "trees"),
+        ("POST", "commits"),
+        ("PATCH", "refs/heads/main"),
+    ]
+    tree = calls[4][2]
+    assert tree["base_tree"] == "base"
+    assert sorted((e["path"], e["sha"]) for e in tree["tree"]) == [
+        ("LLM_Output_db/Omega_Motor/a.txt", "blob-a"),
+        ("LLM_Output_db/Omega_Motor/b.txt", "blob-b"),
+    ]
+    assert calls[5][2]["parents"] == ["head"]
+    assert calls[6][2] == {"sha": "commit"}
+
+
+def test_upload_folder_cache_skips_unchanged(tmp_path, monkeypatch):
+    folder = tmp_path / "cached"
+    folder.mkdir()
+    (folder / "a.txt").write_text("a")
+    (folder / "b.txt").write_text("b")
+
+    calls = []
+
+    def fake_api(method, url, token, data=None, timeout=None):
+        if "/git/" in url:
+            raise error.HTTPError(url, 404, "Not Found", None, None)
+        calls.append((method, url.rsplit("/", 1)[-1].split("?")[0]))
+        if method == "GET":
+            raise error.HTTPError(url, 404, "Not Found", None, None)
+        return {}
+
+    monkeypatch.setattr(
+        "smart_price.core.github_upload._api_request", fake_api
+    )
+    monkeypatch.setattr("smart_price.config.CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setenv("GITHUB_REPO", "owner/repo")
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    monkeypatch.setenv("GITHUB_UPLOAD_CACHE", "1")
+
+    assert upload_folder(folder)
+    assert sorted(c for c in calls if c[0] == "PUT") == [
+        ("PUT", "a.txt"),
+        ("PUT", "b.txt"),
+    ]
+
+    calls.clear()
+    assert upload_folder(folder)
+    assert calls == []
+
+    (folder / "b.txt").write_text("changed")
+    assert upload_folder(folder)
+    assert calls == [("GET", "b.txt"), ("PUT", "b.txt")]
+
+
+def test_upload_folder_cache_dropped_on_delete(tmp_path, monkeypatch):
+    folder = tmp_path / "cached"
+    folder.mkdir()
+    (folder / "a.txt").write_text("a")
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "c.txt").write_text("c")
+
+    calls = []
+
+    def fake_api(method, url, token, data=None, timeout=None):
+        if "/git/" in url:
+            raise error.HTTPError(url, 404, "Not Found", None, None)
+        name = url.rsplit("/", 1)[-1].split("?")[0]
+        calls.append((method, name))
+        if method == "GET" and name == "cached":
+            return [{"type": "file", "path": "LLM_Output_db/cached/a.txt", "sha": "1"}]
+        if method == "GET":
+            raise error.HTTPError(url, 404, "Not Found", None, None)
+        return {}
+
+    monkeypatch.setattr(
+        "smart_price.core.github_upload._api_request", fake_api
+    )
+    monkeypatch.setattr("smart_price.config.CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setenv("GITHUB_REPO", "owner/repo")
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+    monkeypatch.setenv("GITHUB_UPLOAD_CACHE", "1")
+
+    assert upload_folder(folder)
+    assert upload_folder(other)
+    assert delete_github_folder("LLM_Output_db/cached")
+
+    calls.clear()
+    assert upload_folder(folder)
+    assert calls == [("GET", "a.txt"), ("PUT", "a.txt")]
+
+    calls.clear()
+    assert upload_folder(other)
+    assert calls == []
+
+
 def test_delete_github_folder(monkeypatch):
     calls = []
 
     def fake_api(method, url, token, data=None, timeout=None):
+        if "/git/" in url:
+            raise error.HTTPError(url, 404, "Not Found", None, None)
         calls.append((method, url))
         if method == "GET":
             return [
@@ -76,6 +248,48 @@ def test_delete_github_folder(monkeypatch):
     assert calls[1][0] == "DELETE"
 
 
+def test_delete_github_folder_single_commit(monkeypatch):
+    calls = []
+
+    def fake_api(method, url, token, data=None, timeout=None):
+        calls.append((method, url.rsplit("/git/", 1)[-1], data))
+        if url.endswith("/git/ref/heads/main"):
+            return {"object": {"sha": "head"}}
+        if url.endswith("/git/commits/head"):
+            return {"tree": {"sha": "base"}}
+        if url.endswith("/git/trees/base?recursive=1"):
+            return {
+                "truncated": False,
+                "tree": [
+                    {"path": "My_folder", "mode": "040000", "type": "tree"},
+                    {"path": "My_folder/a.txt", "mode": "100644", "type": "blob"},
+                    {"path": "My_folder/sub/b.jpg", "mode": "100644", "type": "blob"},
+                    {"path": "My_folder_2/c.txt", "mode": "100644", "type": "blob"},
+                ],
+            }
+        if url.endswith("/git/trees"):
+            return {"sha": "tree"}
+        if url.endswith("/git/commits"):
+            return {"sha": "commit"}
+        return {}
+
+    monkeypatch.setattr(
+        "smart_price.core.github_upload._api_request", fake_api
+    )
+    monkeypatch.setenv("GITHUB_REPO", "owner/repo")
+    monkeypatch.setenv("GITHUB_TOKEN", "tok")
+
+    assert delete_github_folder("My folder")
+
+    assert [m for m, _, _ in calls] == ["GET", "GET", "GET", "POST", "POST", "PATCH"]
+    tree = calls[3][2]
+    assert tree["base_tree"] == "base"
+    assert [(e["path"], e["sha"]) for e in tree["tree"]] == [
+        ("My_folder/a.txt", None),
+        ("My_folder/sub/b.jpg", None),
+    ]
+
+
 def test_upload_folder_404_no_error(monkeypatch, tmp_path, caplog):
     folder = tmp_path / "Omega"
     folder.mkdir()
@@ -104,12 +318,30 @@ def test_upload_folder_404_no_error(monkeypatch, tmp_path, caplog):
     assert not caplog.records
 
 
-def test_api_request_timeout(monkeypatch):
-    def fake_open(_req, timeout=None):
-        raise TimeoutError("boom")
+class _FakeSession:
+    def __init__(self, status=200, content=b"{}", exc=None):
+        self.status = status
+        self.content = content
+        self.exc = exc
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        if self.exc is not None:
+            raise self.exc
+        return types.SimpleNamespace(
+            status_code=self.status,
+            reason="Reason",
+            headers={},
+            content=self.content,
+            json=lambda: json.loads(self.content),
+        )
+
 
+def test_api_request_timeout(monkeypatch):
+    session = _FakeSession(exc=requests.Timeout("boom"))
     monkeypatch.setattr(
-        "smart_price.core.github_upload.request.urlopen", fake_open
+        "smart_price.core.github_upload._session", lambda: session
     )
 
     with pytest.raises(TimeoutError):
@@ -117,29 +349,38 @@ def test_api_request_timeout(monkeypatch):
 
 
 def test_api_request_timeout_env(monkeypatch):
-    captured = {}
+    session = _FakeSession()
+    monkeypatch.setattr(
+        "smart_price.core.github_upload._session", lambda: session
+    )
+    monkeypatch.setenv("GITHUB_HTTP_TIMEOUT", "12")
+
+    assert _api_request("GET", "http://example", "tok") == {}
+    assert session.calls[0][2]["timeout"] == 12
 
-    class Resp:
-        def __enter__(self):
-            return self
 
-        def __exit__(self, exc_type, exc, tb):
-            pass
+def test_api_request_sends_json_body(monkeypatch):
+    session = _FakeSession(content=b'{"sha": "abc"}')
+    monkeypatch.setattr(
+        "smart_price.core.github_upload._session", lambda: session
+    )
 
-        def read(self):
-            return b"{}"
+    resp = _api_request("PUT", "http://example", "tok", {"content": "eA=="})
+    assert resp == {"sha": "abc"}
+    kwargs = session.calls[0][2]
+    assert json.loads(kwargs["data"]) == {"content": "eA=="}
+    assert kwargs["headers"]["Content-Type"] == "application/json"
 
-    def fake_open(_req, timeout=None):
-        captured["timeout"] = timeout
-        return Resp()
 
+def test_api_request_http_error(monkeypatch):
+    session = _FakeSession(status=404, content=b"")
     monkeypatch.setattr(
-        "smart_price.core.github_upload.request.urlopen", fake_open
+        "smart_price.core.github_upload._session", lambda: session
     )
-    monkeypatch.setenv("GITHUB_HTTP_TIMEOUT", "12")
 
-    _api_request("GET", "http://example", "tok")
-    assert captured["timeout"] == 12
+    with pytest.raises(error.HTTPError) as info:
+        _api_request("GET", "http://example", "tok")
+    assert info.value.code == 404
 
 
 def test_upload_folder_conflict(monkeypatch, tmp_path, caplog):
@@ -152,12 +393,16 @@ def test_upload_folder_conflict(monkeypatch, tmp_path, caplog):
     step = {"n": 0}
 
     def fake_api(method, url, token, data=None, timeout=None):
+        if "/git/" in url:
+            # Git Data API unavailable -> Contents API fallback
+            raise error.HTTPError(url, 404, "Not Found", None, None)
         calls.append(method)
         if method == "GET":
             if step["n"] == 0:
                 step["n"] = 1
                 return {"sha": "old"}
-            return {"sha": "new", "content": base64.b64encode(b"same").decode("ascii")}
+            # Another writer already stored identical content
+            return {"sha": hashlib.sha1(b"blob 4\0same").hexdigest()}
         if method == "PUT" and step["n"] == 1:
             step["n"] = 2
             raise error.HTTPError(url, 409, "Conflict", None, None)
@@ -3,6 +3,8 @@ import types
 import importlib
 import logging
 
+import pytest
+
 def _import_module(monkeypatch):
     """Import extract_excel with minimal stubs if pandas is missing."""
     try:
@@ -46,3 +48,11 @@ def test_column_mapping_logged(monkeypatch, caplog):
     assert "excel column mapping" in messages
     assert "MALZEME" in messages
     assert "Other" in messages
+
+
+def test_map_columns_prefers_first_match(monkeypatch):
+    pd = pytest.importorskip("pandas")
+    ee = _import_module(monkeypatch)
+    df = pd.DataFrame(columns=["Fiyat", "FİYAT ", "Malzeme Kodu", "Açıklama"])
+    out = ee._map_columns(df)
+    assert list(out.columns) == ["Fiyat", "FİYAT ", "Malzeme_Kodu", "Açıklama"]
@@ -1,4 +1,6 @@
 
+import asyncio
+import base64
 import os
 import sys
 import types
@@ -48,7 +50,7 @@ def _setup_openai(monkeypatch):
 class FakeImage:
     def __init__(self, data=b'img'):
         self.data = data
-    def save(self, path, format=None):
+    def save(self, path, format=None, **_kwargs):
         if hasattr(path, 'write'):
             path.write(self.data)
         else:
@@ -96,11 +98,11 @@ def test_parse_sends_bytes_and_cleans_tmp(monkeypatch):
         del sys.modules['pandas']
 
     assert 'images' not in openai_calls
-    first_msg = openai_calls['messages'][0]
+    system_msg, user_msg = openai_calls['messages']
+    assert system_msg['role'] == 'system'
     mime = "jpeg" if PAGE_IMAGE_EXT in {".jpg", ".jpeg"} else PAGE_IMAGE_EXT.lstrip(".")
-    assert first_msg['content'][1]['image_url']['url'].startswith(f'data:image/{mime};base64,')
-    for path in temp_paths:
-        assert not os.path.exists(path)
+    assert user_msg['content'][0]['image_url']['url'].startswith(f'data:image/{mime};base64,')
+    assert temp_paths == []
 
 
 def test_openai_max_retries_env(monkeypatch):
@@ -169,23 +171,20 @@ def test_parse_missing_api_key(monkeypatch):
 
 def test_parse_parallel_execution(monkeypatch):
     def fake_convert(_path, **_kwargs):
-        return [FakeImage(), FakeImage(), FakeImage()]
+        return [FakeImage(b"1"), FakeImage(b"2"), FakeImage(b"3")]
 
     pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
     monkeypatch.setitem(sys.modules, 'pdf2image', pdf2image_stub)
 
-    lock = threading.Lock()
     running = 0
     concurrency = []
 
-    def create(**_kwargs):
+    async def create(**_kwargs):
         nonlocal running
-        with lock:
-            running += 1
-            concurrency.append(running)
-        time.sleep(0.01)
-        with lock:
-            running -= 1
+        running += 1
+        concurrency.append(running)
+        await asyncio.sleep(0.01)
+        running -= 1
         return types.SimpleNamespace(
             choices=[types.SimpleNamespace(message=types.SimpleNamespace(content='[]'))]
         )
@@ -233,7 +232,7 @@ def test_retry_short_prompt(monkeypatch, caplog):
     calls = []
 
     def create(**kwargs):
-        text = kwargs["messages"][0]["content"][0]["text"]
+        text = kwargs["messages"][0]["content"]
         calls.append(text)
         if len(calls) == 1:
             content = "invalid"
@@ -299,6 +298,7 @@ def test_timeout_retry(monkeypatch):
     openai_stub.AsyncOpenAI = lambda *a, **kw: openai_stub
     monkeypatch.setitem(sys.modules, "openai", openai_stub)
     monkeypatch.setenv("OPENAI_API_KEY", "x")
+    monkeypatch.setenv("RETRY_DELAY_BASE", "0")
 
     _pandas_stubbed = False
     try:
@@ -512,9 +512,9 @@ def test_timeout_split(monkeypatch):
             h = box[3] - box[1]
             return FakeImage(w, h)
 
-        def save(self, path, format=None):
+        def save(self, path, format=None, **_kwargs):
             if hasattr(path, "write"):
-                path.write(b"img")
+                path.write(str(id(self)).encode())
             else:
                 with open(path, "wb") as f:
                     f.write(b"img")
@@ -589,7 +589,7 @@ def test_openai_request_timeout(monkeypatch):
         captured.update(kw)
         return openai_mod
 
-    monkeypatch.setattr(openai_mod, "OpenAI", _ctor)
+    monkeypatch.setattr(openai_mod, "AsyncOpenAI", _ctor)
 
     import importlib
     import smart_price.config as conf
@@ -618,19 +618,65 @@ def test_llm_workers_env(monkeypatch):
     importlib.reload(conf)
     importlib.reload(mod)
 
-    captured = {}
-    from concurrent.futures import ThreadPoolExecutor as RealExecutor
+    running = 0
+    concurrency = []
 
-    class CaptureExecutor(RealExecutor):
-        def __init__(self, *a, **kw):
-            captured["max_workers"] = kw.get("max_workers") if "max_workers" in kw else (a[0] if a else None)
-            super().__init__(*a, **kw)
+    async def create(**_kwargs):
+        nonlocal running
+        running += 1
+        concurrency.append(running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content='[]'))]
+        )
 
-    monkeypatch.setattr(mod, "ThreadPoolExecutor", CaptureExecutor)
+    monkeypatch.setattr(sys.modules["openai"].chat.completions, "create", create)
 
     mod.parse("dummy.pdf")
 
-    assert captured.get("max_workers") == 1
+    assert concurrency and max(concurrency) == 1
+
+
+def test_sync_client_fallback_runs_concurrently(monkeypatch):
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage(b"1"), FakeImage(b"2"), FakeImage(b"3")]
+
+    pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+
+    _setup_openai(monkeypatch)
+    openai_mod = sys.modules["openai"]
+    monkeypatch.delattr(openai_mod, "AsyncOpenAI")
+
+    lock = threading.Lock()
+    running = 0
+    concurrency = []
+
+    def create(**_kwargs):
+        nonlocal running
+        with lock:
+            running += 1
+            concurrency.append(running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content='[]'))]
+        )
+
+    monkeypatch.setattr(openai_mod.chat.completions, "create", create)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    result = mod.parse_result("dummy.pdf")
+
+    assert max(concurrency) > 1
+    assert [s["page_number"] for s in result.page_summary] == [1, 2, 3]
 
 
 def test_page_numbers_from_range(monkeypatch):
@@ -652,3 +698,764 @@ def test_page_numbers_from_range(monkeypatch):
     summary = getattr(df, "page_summary", None)
 
     assert summary and [s.get("page_number") for s in summary] == [2, 3, 4, 5]
+
+
+def test_parse_result_tuple(monkeypatch):
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage(), FakeImage()]
+
+    pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+
+    _setup_openai(monkeypatch)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    result = mod.parse_result("dummy.pdf")
+    assert [s["page_number"] for s in result.page_summary] == [1, 2]
+    assert result.token_counts == {"input": 0, "output": 0, "cached": 0}
+    assert result.df.empty
+
+    df = result.to_frame()
+    assert df is result.df
+    assert getattr(df, "page_summary") == result.page_summary
+
+
+def test_convert_uses_threads_and_temp_folder(monkeypatch):
+    captured = {}
+
+    def fake_convert(_path, **kwargs):
+        captured.update(kwargs)
+        assert os.path.isdir(kwargs["output_folder"])
+        return [FakeImage()]
+
+    pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+
+    _setup_openai(monkeypatch)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    mod.parse("dummy.pdf")
+
+    assert captured["fmt"] == "ppm"
+    assert captured["thread_count"] >= 1
+    assert not os.path.exists(captured["output_folder"])
+
+
+def test_progress_follows_completion_order(monkeypatch):
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage(b"slow"), FakeImage(b"a"), FakeImage(b"b")]
+
+    pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+
+    _setup_openai(monkeypatch)
+    finished: list[str] = []
+
+    async def create(**kwargs):
+        url = kwargs["messages"][-1]["content"][0]["image_url"]["url"]
+        slow = url.endswith(base64.b64encode(b"slow").decode())
+        await asyncio.sleep(0.05 if slow else 0)
+        finished.append("slow" if slow else "fast")
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content='[]'))]
+        )
+
+    monkeypatch.setattr(sys.modules["openai"].chat.completions, "create", create)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    progress: list[float] = []
+    result = mod.parse_result("dummy.pdf", progress_callback=progress.append)
+
+    assert finished[-1] == "slow"
+    assert progress == pytest.approx([1 / 3, 2 / 3, 1.0])
+    assert [s["page_number"] for s in result.page_summary] == [1, 2, 3]
+
+
+def test_large_pages_downscaled(monkeypatch):
+    resized: list[tuple[int, int]] = []
+
+    class BigImage(FakeImage):
+        size = (3000, 1500)
+
+        def resize(self, size, _resample=None):
+            resized.append(size)
+            return FakeImage()
+
+    def fake_convert(_path, **_kwargs):
+        return [BigImage(), FakeImage()]
+
+    pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+
+    _setup_openai(monkeypatch)
+    monkeypatch.setenv("SMART_PRICE_MAX_EDGE", "1000")
+    monkeypatch.setenv("SMART_PRICE_SHORT_EDGE", "0")
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    mod.parse("dummy.pdf")
+
+    assert resized == [(1000, 500)]
+
+
+def test_llm_cache_reuses_responses(monkeypatch, tmp_path):
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage()]
+
+    pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+
+    _setup_openai(monkeypatch)
+    monkeypatch.setenv("SMART_PRICE_LLM_CACHE", "1")
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    calls: list[int] = []
+
+    def create(**_kwargs):
+        calls.append(1)
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(
+                content='[{"Malzeme_Kodu": "A1", "Fiyat": "5"}]'
+            ))]
+        )
+
+    monkeypatch.setattr(sys.modules["openai"].chat.completions, "create", create)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    first = mod.parse_result("dummy.pdf")
+    second = mod.parse_result("dummy.pdf")
+
+    assert calls == [1]
+    assert second.df.to_dict("records") == first.df.to_dict("records")
+    assert (tmp_path / "llm_cache.sqlite").exists()
+
+
+def test_llm_batch_groups_pages(monkeypatch):
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage(), FakeImage(), FakeImage()]
+
+    pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+
+    _setup_openai(monkeypatch)
+    monkeypatch.setenv("SMART_PRICE_LLM_BATCH", "2")
+    image_counts: list[int] = []
+
+    def create(**kwargs):
+        parts = kwargs["messages"][-1]["content"]
+        images = [p for p in parts if p["type"] == "image_url"]
+        image_counts.append(len(images))
+        if len(images) == 2:
+            content = '{"1": [{"Malzeme_Kodu": "A"}], "2": []}'
+        else:
+            content = '[{"Malzeme_Kodu": "C"}]'
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=content))]
+        )
+
+    monkeypatch.setattr(sys.modules["openai"].chat.completions, "create", create)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    result = mod.parse_result("dummy.pdf")
+
+    assert sorted(image_counts) == [1, 2]
+    assert result.df["Malzeme_Kodu"].tolist() == ["A", "C"]
+    assert result.df["Sayfa"].tolist() == [1, 3]
+    assert [s["status"] for s in result.page_summary] == ["success", "empty", "success"]
+
+
+def test_llm_batch_falls_back_to_single_pages(monkeypatch):
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage(b"1"), FakeImage(b"2")]
+
+    pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+
+    _setup_openai(monkeypatch)
+    monkeypatch.setenv("SMART_PRICE_LLM_BATCH", "2")
+    image_counts: list[int] = []
+
+    def create(**kwargs):
+        parts = kwargs["messages"][-1]["content"]
+        image_counts.append(sum(p["type"] == "image_url" for p in parts))
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content='[{"Malzeme_Kodu": "X"}]'))]
+        )
+
+    monkeypatch.setattr(sys.modules["openai"].chat.completions, "create", create)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    result = mod.parse_result("dummy.pdf")
+
+    assert image_counts == [2, 1, 1]
+    assert result.df["Sayfa"].tolist() == [1, 2]
+
+
+def test_async_client_closed_after_each_parse(monkeypatch):
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage()]
+
+    pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+
+    _setup_openai(monkeypatch)
+    openai_mod = sys.modules["openai"]
+    created: list[types.SimpleNamespace] = []
+
+    def _ctor(*_a, **_kw):
+        client = types.SimpleNamespace(chat=openai_mod.chat, closed=False)
+
+        async def close():
+            client.closed = True
+
+        client.close = close
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(openai_mod, "AsyncOpenAI", _ctor)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    mod.parse("dummy.pdf")
+    mod.parse("dummy.pdf")
+
+    assert len(created) == 2
+    assert all(client.closed for client in created)
+
+
+def test_rows_to_frame_merges_aliases_and_pages():
+    import smart_price.core.ocr_llm_fallback as mod
+
+    rows = [
+        {"Malzeme_Kodu": "A", "Fiyat": "1", "Sayfa": "7"},
+        {"Malzeme Kodu": "B", "Fiyat": "2"},
+        "noise",
+        {"Malzeme_Kodu": None, "Malzeme Kodu": "C", "Ana Baslik": "X"},
+    ]
+    df = mod._rows_to_frame(rows, [1, 2, 2, 3])
+
+    assert "Malzeme Kodu" not in df.columns
+    assert df["Malzeme_Kodu"].tolist() == ["A", "B", "C"]
+    assert df["Ana_Baslik"].tolist()[2] == "X"
+    assert df["Sayfa"].tolist() == ["7", 2, 3]
+
+
+def test_parse_cache_skips_rendering(monkeypatch, tmp_path):
+    renders: list[str] = []
+
+    def fake_convert(path, **_kwargs):
+        renders.append(path)
+        return [FakeImage()]
+
+    pdf2image_stub = types.SimpleNamespace(convert_from_path=fake_convert)
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+
+    _setup_openai(monkeypatch)
+    monkeypatch.setenv("SMART_PRICE_LLM_CACHE", "1")
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path / "cache"))
+    pdf = tmp_path / "list.pdf"
+    pdf.write_bytes(b"%PDF-1.4 one")
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    first = mod.parse_result(str(pdf))
+    progress: list[float] = []
+    second = mod.parse_result(str(pdf), progress_callback=progress.append)
+    assert len(renders) == 1
+    assert progress == [1.0]
+    assert second.page_summary == first.page_summary
+
+    pdf.write_bytes(b"%PDF-1.4 two")
+    mod.parse_result(str(pdf))
+    assert len(renders) == 2
+
+    # Image settings change what the model sees, so they miss the cache.
+    for name, value in [
+        ("SMART_PRICE_JPEG_QUALITY", "80"),
+        ("SMART_PRICE_SHORT_EDGE", "1024"),
+        ("SMART_PRICE_MAX_EDGE", "2048"),
+    ]:
+        monkeypatch.setenv(name, value)
+        mod.parse_result(str(pdf))
+    assert len(renders) == 5
+    mod.parse_result(str(pdf))
+    assert len(renders) == 5
+
+
+def test_retries_reuse_encoded_image(monkeypatch):
+    saves: list[int] = []
+
+    class CountingImage(FakeImage):
+        def save(self, path, format=None, **kwargs):
+            saves.append(1)
+            super().save(path, format, **kwargs)
+
+    def fake_convert(_path, **_kwargs):
+        return [CountingImage()]
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_path=fake_convert))
+
+    payloads: list[str] = []
+
+    def create(**kwargs):
+        payloads.append(kwargs["messages"][-1]["content"][-1]["image_url"]["url"])
+        raise TimeoutError("boom")
+
+    chat_stub = types.SimpleNamespace(completions=types.SimpleNamespace(create=create))
+    openai_stub = types.SimpleNamespace(chat=chat_stub)
+    openai_stub.AsyncOpenAI = lambda *a, **kw: openai_stub
+    monkeypatch.setitem(sys.modules, "openai", openai_stub)
+    monkeypatch.setenv("OPENAI_API_KEY", "x")
+    monkeypatch.setenv("MAX_RETRIES", "2")
+    monkeypatch.setenv("MAX_RETRY_WAIT_TIME", "0")
+    monkeypatch.setenv("RETRY_DELAY_BASE", "0")
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    mod.parse("dummy.pdf")
+
+    assert len(payloads) == 3
+    assert len(set(payloads)) == 1
+    assert len(saves) == 1
+
+
+def test_retry_delay_backoff(monkeypatch):
+    import smart_price.core.ocr_llm_fallback as mod
+
+    monkeypatch.setattr(mod.config, "RETRY_DELAY_BASE", 1.0)
+    monkeypatch.setattr(mod.config, "MAX_RETRY_WAIT_TIME", 5)
+    assert [mod._retry_delay(n) for n in range(1, 5)] == [1.0, 2.0, 4.0, 5.0]
+
+    monkeypatch.setattr(mod.config, "RETRY_DELAY_BASE", 0)
+    assert mod._retry_delay(3) == 0.0
+
+
+def test_page_jpeg_settings(monkeypatch):
+    save_kwargs: list[dict] = []
+
+    class RecordingImage(FakeImage):
+        def save(self, path, format=None, **kwargs):
+            save_kwargs.append({"format": format, **kwargs})
+            super().save(path, format, **kwargs)
+
+    def fake_convert(_path, **_kwargs):
+        return [RecordingImage()]
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_path=fake_convert))
+    _setup_openai(monkeypatch)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    mod.parse("dummy.pdf")
+
+    assert save_kwargs == [
+        {
+            "format": "JPEG",
+            "quality": 60,
+            "optimize": True,
+            "subsampling": 2,
+        }
+    ]
+
+    save_kwargs.clear()
+    monkeypatch.setenv("SMART_PRICE_JPEG_QUALITY", "85")
+    mod.parse("dummy.pdf")
+    assert save_kwargs[0]["quality"] == 85
+
+
+def test_downscale_caps_short_edge():
+    import smart_price.core.ocr_llm_fallback as mod
+
+    resized: list[tuple[int, int]] = []
+
+    class Page:
+        size = (1240, 1754)
+
+        def resize(self, size, _resample=None):
+            resized.append(size)
+            return self
+
+    mod.downscale_image(Page(), max_edge=2048, short_edge=768)
+    assert resized == [(768, 1086)]
+
+    resized.clear()
+    mod.downscale_image(Page(), max_edge=0, short_edge=0)
+    assert resized == []
+
+
+def test_pages_rendered_in_spans(monkeypatch):
+    spans: list[tuple[int, int]] = []
+    progress: list[float] = []
+
+    def fake_convert(_path, first_page=None, last_page=None, **_kwargs):
+        spans.append((first_page, last_page))
+        return [FakeImage(str(n).encode()) for n in range(first_page, last_page + 1)]
+
+    def fake_info(_path, **_kwargs):
+        return {"Pages": 5}
+
+    pdf2image_stub = types.SimpleNamespace(
+        convert_from_path=fake_convert, pdfinfo_from_path=fake_info
+    )
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+    _setup_openai(monkeypatch)
+    monkeypatch.setenv("SMART_PRICE_LLM_WORKERS", "1")
+    monkeypatch.setattr(os, "cpu_count", lambda: 3)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    res = mod.parse_result("dummy.pdf", page_range=range(2, 10), progress_callback=progress.append)
+
+    assert spans == [(2, 3), (4, 5)]
+    assert [s["page_number"] for s in res.page_summary] == [2, 3, 4, 5]
+    assert progress[-1] == 1.0
+
+
+def test_rendering_bounded_by_queue(monkeypatch):
+    rendered: list[int] = []
+    lead: list[int] = []
+
+    def fake_convert(_path, first_page=None, last_page=None, **_kwargs):
+        rendered.extend(range(first_page, last_page + 1))
+        return [FakeImage(str(n).encode()) for n in range(first_page, last_page + 1)]
+
+    def fake_info(_path, **_kwargs):
+        return {"Pages": 20}
+
+    pdf2image_stub = types.SimpleNamespace(
+        convert_from_path=fake_convert, pdfinfo_from_path=fake_info
+    )
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image_stub)
+    _setup_openai(monkeypatch)
+    monkeypatch.setenv("SMART_PRICE_LLM_WORKERS", "1")
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    sent = 0
+    create = sys.modules["openai"].chat.completions.create
+
+    def counting_create(**kwargs):
+        nonlocal sent
+        sent += 1
+        lead.append(len(rendered) - sent)
+        return create(**kwargs)
+
+    sys.modules["openai"].chat.completions.create = counting_create
+
+    res = mod.parse_result("dummy.pdf")
+
+    assert len(res.page_summary) == 20
+    assert max(lead) <= 5
+
+
+def test_pages_encoded_off_event_loop(monkeypatch):
+    threads: list[str] = []
+
+    class ThreadImage(FakeImage):
+        def save(self, path, format=None, **kwargs):
+            threads.append(threading.current_thread().name)
+            super().save(path, format, **kwargs)
+
+    def fake_convert(_path, **_kwargs):
+        return [ThreadImage(), ThreadImage()]
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_path=fake_convert))
+    _setup_openai(monkeypatch)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    mod.parse("dummy.pdf")
+
+    assert len(threads) == 2
+    assert all(name.startswith("sp-encode") for name in threads)
+
+
+def test_pymupdf_renderer(monkeypatch):
+    opened: list[str] = []
+    rendered: list[int] = []
+
+    class Pixmap:
+        width, height = 2, 1
+        samples = bytes(6)
+
+    class Page:
+        def __init__(self, num):
+            self.num = num
+
+        def get_pixmap(self, matrix=None, alpha=True):
+            assert matrix == (2.0, 2.0) and alpha is False
+            rendered.append(self.num)
+            return Pixmap()
+
+    class Doc:
+        page_count = 3
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_exc):
+            return False
+
+        def __getitem__(self, idx):
+            return Page(idx + 1)
+
+    def fitz_open(path):
+        opened.append(path)
+        return Doc()
+
+    def fail_convert(*_a, **_kw):
+        raise AssertionError("pdf2image should not be used")
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_path=fail_convert))
+    _setup_openai(monkeypatch)
+    monkeypatch.setenv("SMART_PRICE_PYMUPDF", "1")
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+    monkeypatch.setattr(
+        mod, "fitz", types.SimpleNamespace(open=fitz_open, Matrix=lambda a, b: (a, b))
+    )
+
+    res = mod.parse_result("dummy.pdf", page_range=range(2, 4), dpi=144)
+
+    assert rendered == [2, 3]
+    assert set(opened) == {"dummy.pdf"}
+    assert [s["page_number"] for s in res.page_summary] == [2, 3]
+
+
+def test_prompt_sent_as_shared_system_message(monkeypatch):
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage(b"a"), FakeImage(b"b"), FakeImage(b"c")]
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_path=fake_convert))
+    _setup_openai(monkeypatch)
+    monkeypatch.setenv("SMART_PRICE_LLM_BATCH", "2")
+    sent: list[list[dict]] = []
+
+    def create(**kwargs):
+        sent.append(kwargs["messages"])
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content='{"1": [], "2": []}'))]
+        )
+
+    monkeypatch.setattr(sys.modules["openai"].chat.completions, "create", create)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    mod.parse("dummy.pdf", prompt="GUIDE")
+
+    assert [m[0] for m in sent] == [{"role": "system", "content": "GUIDE"}] * 2
+    user_parts = sorted((m[1]["content"] for m in sent), key=len)
+    assert [p["type"] for p in user_parts[0]] == ["image_url"]
+    assert [p["type"] for p in user_parts[1]] == ["text", "image_url", "image_url"]
+    assert "GUIDE" not in user_parts[1][0]["text"]
+
+
+def test_cached_prompt_tokens_counted(monkeypatch, caplog):
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage(b"1"), FakeImage(b"2")]
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_path=fake_convert))
+    _setup_openai(monkeypatch)
+
+    def create(**_kwargs):
+        usage = types.SimpleNamespace(
+            prompt_tokens=1200,
+            completion_tokens=50,
+            prompt_tokens_details=types.SimpleNamespace(cached_tokens=1024),
+        )
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content="[]"))],
+            usage=usage,
+        )
+
+    monkeypatch.setattr(sys.modules["openai"].chat.completions, "create", create)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    with caplog.at_level(logging.INFO, logger="smart_price"):
+        result = mod.parse_result("dummy.pdf")
+
+    assert result.token_counts == {"input": 2400, "output": 100, "cached": 2048}
+    assert "cached=2048 (85%)" in caplog.text
+
+
+def test_parse_batch_submits_and_collects(monkeypatch):
+    import json
+
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage(), FakeImage()]
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_path=fake_convert))
+    _setup_openai(monkeypatch)
+
+    uploaded: list[dict] = []
+    statuses = iter(["in_progress", "completed"])
+
+    def files_create(file, purpose):
+        assert purpose == "batch"
+        uploaded.extend(json.loads(line) for line in file.read().decode().splitlines())
+        return types.SimpleNamespace(id="file-in")
+
+    def files_content(file_id):
+        assert file_id == "file-out"
+        lines = []
+        for req in uploaded:
+            page = req["custom_id"].rsplit("|", 1)[1]
+            content = json.dumps([{"Malzeme_Kodu": f"{req['custom_id'][0]}{page}"}])
+            lines.append(json.dumps({
+                "custom_id": req["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "choices": [{"message": {"content": content}}],
+                        "usage": {"prompt_tokens": 10, "completion_tokens": 2},
+                    },
+                },
+                "error": None,
+            }))
+        return types.SimpleNamespace(text="\n".join(reversed(lines)))
+
+    created: list[dict] = []
+    client = types.SimpleNamespace(
+        files=types.SimpleNamespace(create=files_create, content=files_content),
+        batches=types.SimpleNamespace(
+            create=lambda **kw: created.append(kw) or types.SimpleNamespace(id="batch-1"),
+            retrieve=lambda _id: types.SimpleNamespace(
+                status=next(statuses), output_file_id="file-out", error_file_id=None
+            ),
+        ),
+    )
+    sys.modules["openai"].OpenAI = lambda *a, **kw: client
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+    monkeypatch.setattr(mod.time, "sleep", lambda _s: None)
+
+    results = mod.parse_batch(["a.pdf", "b.pdf"])
+
+    assert [r["custom_id"] for r in uploaded] == ["a.pdf|1", "a.pdf|2", "b.pdf|1", "b.pdf|2"]
+    assert uploaded[0]["url"] == "/v1/chat/completions"
+    assert uploaded[0]["body"]["messages"][0]["role"] == "system"
+    assert created[0]["completion_window"] == "24h"
+    assert results["a.pdf"].df["Malzeme_Kodu"].tolist() == ["a1", "a2"]
+    assert results["b.pdf"].df["Sayfa"].tolist() == [1, 2]
+    assert results["b.pdf"].token_counts == {"input": 20, "output": 4, "cached": 0}
+
+
+def test_identical_pages_share_one_request(monkeypatch):
+    def fake_convert(_path, **_kwargs):
+        return [FakeImage(b"same"), FakeImage(b"other"), FakeImage(b"same")]
+
+    monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_path=fake_convert))
+    _setup_openai(monkeypatch)
+    urls: list[str] = []
+
+    async def create(**kwargs):
+        urls.append(kwargs["messages"][-1]["content"][0]["image_url"]["url"])
+        await asyncio.sleep(0.01)
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content='[{"Malzeme_Kodu": "X"}]'))]
+        )
+
+    monkeypatch.setattr(sys.modules["openai"].chat.completions, "create", create)
+
+    import importlib
+    import smart_price.config as conf
+    import smart_price.core.ocr_llm_fallback as mod
+    importlib.reload(conf)
+    importlib.reload(mod)
+
+    result = mod.parse_result("dummy.pdf")
+
+    assert len(urls) == 2
+    assert result.df["Sayfa"].tolist() == [1, 2, 3]
+    assert [s["status"] for s in result.page_summary] == ["success"] * 3
+
+
+def test_parse_reply_skips_cleanup_for_plain_json(monkeypatch):
+    import smart_price.core.ocr_llm_fallback as mod
+
+    cleaned = []
+    monkeypatch.setattr(mod, "gpt_clean_text", lambda t: cleaned.append(t) or t.strip("`json\n"))
+
+    assert mod._parse_reply('{"products": [{"Fiyat": "1"}]}') == {"products": [{"Fiyat": "1"}]}
+    assert cleaned == []
+    assert mod._parse_reply('```json\n[{"Fiyat": "2"}]\n```') == [{"Fiyat": "2"}]
+    assert len(cleaned) == 1
@@ -64,11 +64,15 @@ def test_ocr_llm_fallback_summary(monkeypatch):
     class FakeImage:
         def __init__(self, data=b"img"):
             self.data = data
-        def save(self, path, format=None):
-            with open(path, "wb") as f:
-                f.write(self.data)
+        def save(self, path, format=None, **_kwargs):
+            if hasattr(path, "write"):
+                path.write(self.data)
+            else:
+                with open(path, "wb") as f:
+                    f.write(self.data)
     def fake_convert(_path, **_kw):
-        return [FakeImage(), FakeImage()]
+        # Distinct bytes so the pages are not answered as duplicates.
+        return [FakeImage(b"img1"), FakeImage(b"img2")]
     monkeypatch.setitem(sys.modules, "pdf2image", types.SimpleNamespace(convert_from_path=fake_convert))
 
     contents = [
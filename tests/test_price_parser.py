@@ -36,8 +36,14 @@ if 'PIL' not in sys.modules:
     sys.modules['PIL'] = pil_stub
     sys.modules['PIL.Image'] = image_stub
 
-from smart_price.core.common_utils import normalize_price
+from smart_price.core.common_utils import normalize_price, normalize_price_series
 from smart_price.core.common_utils import detect_brand
+from smart_price.core.common_utils import (
+    detect_currency,
+    detect_currency_series,
+    normalize_currency,
+    normalize_currency_series,
+)
 from smart_price.core.common_utils import split_code_description
 from smart_price.core.common_utils import gpt_clean_text
 from smart_price.core.extract_excel import extract_from_excel
@@ -405,6 +411,40 @@ def test_normalize_price_english_only():
     assert normalize_price("1,234.56") is None
 
 
+@pytest.mark.parametrize("numba_flag", ["0", "1"])
+def test_normalize_price_series_matches_scalar(monkeypatch, numba_flag):
+    if numba_flag == "1":
+        pytest.importorskip("numba")
+    monkeypatch.setenv("SMART_PRICE_NUMBA", numba_flag)
+    values = ["1.234,56", "1,234.56", "12 TL", "", None, "abc", "٣,5", 7, "0,001"]
+    result = normalize_price_series(pd.Series(values, dtype=object))
+    for raw, parsed in zip(values, result):
+        expected = normalize_price(raw)
+        if expected is None:
+            assert pd.isna(parsed)
+        else:
+            assert parsed == expected
+
+
+def test_currency_series_match_scalar():
+    texts = ["12 TL", "5 €", "USD 3", "9,90", "12 TL", None, "5 €"]
+    detected = detect_currency_series(pd.Series(texts))
+    expected = pd.Series([detect_currency(t) for t in texts], dtype=object)
+    assert detected.fillna("-").tolist() == expected.fillna("-").tolist()
+    labels = ["TL", " usd ", "€", "XYZ", "TL", None, ""]
+    normalized = normalize_currency_series(pd.Series(labels, index=range(10, 17)))
+    assert list(normalized.index) == list(range(10, 17))
+    expected = pd.Series([normalize_currency(v) for v in labels], dtype=object)
+    assert normalized.fillna("-").tolist() == expected.fillna("-").tolist()
+
+
+def test_normalize_currency_series_keeps_known_categorical():
+    cat = pd.Series(pd.Categorical(["₺", "$", None], categories=["₺", "$", "€"]))
+    assert normalize_currency_series(cat) is cat
+    other = pd.Series(pd.Categorical(["TL", "USD"]))
+    assert normalize_currency_series(other).tolist() == ["₺", "$"]
+
+
 def test_detect_brand_from_filename():
     assert detect_brand("Acme_prices.xlsx") == "Acme"
     assert detect_brand("/path/to/BrandB-2021.pdf") == "BrandB"
@@ -604,6 +644,88 @@ def test_extract_from_pdf_default_currency(monkeypatch):
     assert called.get("path") == "dummy.pdf"
 
 
+def test_extract_from_pdf_currency_from_price_text(monkeypatch):
+    if not HAS_PANDAS:
+        pytest.skip("pandas not installed")
+    import smart_price.core.extract_pdf as pdf_mod
+
+    def fake_parse(path, page_range=None, **_kw):
+        import pandas as pd
+        return pd.DataFrame(
+            {
+                "Açıklama": ["ItemA", "ItemB", "ItemC"],
+                "Fiyat": ["100 USD", "5 €", "7"],
+                "Para_Birimi": [None, None, "TL"],
+                "Ana_Baslik": ["Motors", "Motors", "Pumps"],
+            }
+        )
+    monkeypatch.setattr(pdf_mod.ocr_llm_fallback, "parse", fake_parse)
+
+    result = extract_from_pdf("dummy.pdf")
+    assert result["Para_Birimi"].tolist() == ["$", "€", "₺"]
+    assert isinstance(result["Para_Birimi"].dtype, pd.CategoricalDtype)
+    assert list(result["Ana_Baslik"].cat.categories) == ["Motors", "Pumps"]
+    assert result["Sayfa"].dtype == "int32"
+    assert result["Record_Code"].tolist() == ["dummy|1|1", "dummy|1|2", "dummy|1|3"]
+    assert result["Image_Path"].iloc[0] == f"LLM_Output_db/dummy/page_image_page_01{PAGE_IMAGE_EXT}"
+
+
+def test_extract_from_pdf_debug_disabled(monkeypatch, tmp_path):
+    if not HAS_PANDAS:
+        pytest.skip("pandas not installed")
+    import smart_price.core.extract_pdf as pdf_mod
+
+    monkeypatch.setenv("SMART_PRICE_DEBUG", "0")
+    monkeypatch.setenv("SMART_PRICE_DEBUG_DIR", str(tmp_path / "img"))
+    monkeypatch.setenv("SMART_PRICE_TEXT_DIR", str(tmp_path / "txt"))
+    uploads = []
+    monkeypatch.setattr(pdf_mod, "upload_folder", lambda *a, **kw: uploads.append(a))
+
+    def fake_parse(path, page_range=None, **_kw):
+        import pandas as pd
+        return pd.DataFrame({"Açıklama": ["ItemA"], "Fiyat": [100.0]})
+    monkeypatch.setattr(pdf_mod.ocr_llm_fallback, "parse", fake_parse)
+
+    result = extract_from_pdf("dummy.pdf")
+    assert len(result) == 1
+    assert uploads == []
+    assert not (tmp_path / "img").exists()
+    assert not (tmp_path / "txt").exists()
+
+
+def test_extract_from_pdf_uploads_in_background(monkeypatch, tmp_path):
+    if not HAS_PANDAS:
+        pytest.skip("pandas not installed")
+    import threading
+    import smart_price.core.extract_pdf as pdf_mod
+
+    monkeypatch.setenv("SMART_PRICE_DEBUG", "1")
+    monkeypatch.setenv("SMART_PRICE_DEBUG_DIR", str(tmp_path / "img"))
+    monkeypatch.setenv("SMART_PRICE_TEXT_DIR", str(tmp_path / "txt"))
+    release = threading.Event()
+    uploads = []
+
+    def slow_upload(folder, **kw):
+        release.wait(5)
+        uploads.append((folder, kw["remote_prefix"]))
+        return True
+    monkeypatch.setattr(pdf_mod, "upload_folder", slow_upload)
+
+    def fake_parse(path, page_range=None, **_kw):
+        import pandas as pd
+        return pd.DataFrame({"Açıklama": ["ItemA"], "Fiyat": [100.0]})
+    monkeypatch.setattr(pdf_mod.ocr_llm_fallback, "parse", fake_parse)
+
+    progress = []
+    result = extract_from_pdf("dummy.pdf", progress_callback=progress.append)
+    assert len(result) == 1
+    assert progress == [1.0]
+    assert uploads == []
+    release.set()
+    pdf_mod._UPLOAD_POOL.submit(lambda: None).result()
+    assert uploads == [(tmp_path / "img" / "dummy", "LLM_Output_db/dummy")]
+
+
 def test_extract_from_pdf_table_headers(monkeypatch):
     if not HAS_PANDAS:
         pytest.skip("pandas not installed")
@@ -947,6 +1069,57 @@ def test_merge_files_all_missing_code_warning(monkeypatch, caplog):
     assert "marka=Brand" in messages
 
 
+def test_merge_files_drops_rows_missing_code_or_price(monkeypatch):
+    if not HAS_PANDAS:
+        pytest.skip("pandas not installed")
+    import pandas as pd
+
+    df = pd.DataFrame(
+        {
+            "Malzeme_Kodu": ["A", None, "C", "D"],
+            "Açıklama": ["a", "b", "c", "d"],
+            "Fiyat": [1.0, 2.0, None, 4.0],
+        }
+    )
+    monkeypatch.setattr(streamlit_app, "extract_from_excel_file", lambda *a, **k: df.copy())
+
+    class FakeUpload:
+        name = "src.xlsx"
+
+        def read(self):
+            return b"data"
+
+    result = streamlit_app.merge_files([FakeUpload()])
+
+    assert list(result["Malzeme_Kodu"]) == ["A", "D"]
+    assert list(result["Fiyat"]) == [1.0, 4.0]
+
+
+def test_merge_files_passes_upload_stream(monkeypatch):
+    if not HAS_PANDAS:
+        pytest.skip("pandas not installed")
+    import io
+    import pandas as pd
+
+    class Upload(io.BytesIO):
+        name = "src.xlsx"
+
+    upload = Upload(b"data")
+    upload.read()
+    seen = {}
+
+    def fake_extract(file, *, file_name=None):
+        seen["file"] = file
+        seen["pos"] = file.tell()
+        return pd.DataFrame({"Malzeme_Kodu": ["A"], "Açıklama": ["a"], "Fiyat": [1.0]})
+
+    monkeypatch.setattr(streamlit_app, "extract_from_excel_file", fake_extract)
+
+    streamlit_app.merge_files([upload])
+
+    assert seen == {"file": upload, "pos": 0}
+
+
 def test_llm_debug_files(monkeypatch, tmp_path):
     if not HAS_PANDAS:
         pytest.skip("pandas not installed")
@@ -1141,3 +1314,267 @@ def test_price_parser_db_schema(monkeypatch, tmp_path):
     )
     conn.close()
 
+
+
+@pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
+def test_price_parser_processes_files_in_parallel(monkeypatch, tmp_path):
+    pytest.importorskip("openpyxl")
+    import pandas as pd
+    import csv
+    import sqlite3
+    import argparse
+    import os
+    from smart_price import price_parser
+
+    files = []
+    for name, item, price in [("a.xlsx", "Elma", "10"), ("b.xlsx", "Armut", "20")]:
+        path = tmp_path / name
+        pd.DataFrame({"Ürün Adı": [item], "Fiyat": [price]}).to_excel(path, index=False)
+        files.append(str(path))
+    files.append(str(tmp_path / "notes.txt"))
+
+    args = argparse.Namespace(
+        files=files,
+        output=str(tmp_path / "out.xlsx"),
+        db=str(tmp_path / "out.db"),
+        log=str(tmp_path / "out.csv"),
+        show_log=False,
+    )
+    monkeypatch.setattr(price_parser, "parse_args", lambda: args)
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    price_parser.main()
+
+    with open(args.log, encoding="utf-8") as fh:
+        assert [r["file"] for r in csv.DictReader(fh)] == ["a.xlsx", "b.xlsx"]
+    conn = sqlite3.connect(args.db)
+    try:
+        rows = conn.execute("SELECT description FROM prices ORDER BY description").fetchall()
+    finally:
+        conn.close()
+    assert rows == [("Armut",), ("Elma",)]
+
+
+def test_parse_page_range_spec():
+    from smart_price.price_parser import _parse_page_range
+
+    assert _parse_page_range("1-3, 5 ,7 - 8,3") == [1, 2, 3, 5, 7, 8]
+    assert _parse_page_range("4-2,,x") == []
+    assert _parse_page_range("1-x") == []
+    assert _parse_page_range("abc5") == []
+    assert _parse_page_range("1--4") == []
+    assert _parse_page_range("2, 1-x, 4") == [2, 4]
+
+
+@pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
+def test_price_parser_keeps_last_duplicate(monkeypatch, tmp_path):
+    import pandas as pd
+    import sqlite3
+    import argparse
+    from smart_price import price_parser
+
+    sample_df = pd.DataFrame(
+        {
+            "Malzeme_Kodu": ["A1", "B2", "A1"],
+            "Açıklama": ["Old", "Other", "New"],
+            "Fiyat": [10.0, 10.0, 10.0],
+        }
+    )
+    monkeypatch.setattr(price_parser, "extract_from_excel", lambda *_args, **_kw: sample_df.copy())
+    monkeypatch.setattr(pd.DataFrame, "to_excel", lambda *a, **k: None)
+
+    args = argparse.Namespace(
+        files=[str(tmp_path / "src.xlsx")],
+        output=str(tmp_path / "out.xlsx"),
+        db=str(tmp_path / "out.db"),
+        log=str(tmp_path / "out.csv"),
+        show_log=False,
+    )
+    monkeypatch.setattr(price_parser, "parse_args", lambda: args)
+
+    price_parser.main()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        rows = conn.execute("SELECT material_code, description FROM prices").fetchall()
+    finally:
+        conn.close()
+    assert rows == [("A1", "New"), ("B2", "Other")]
+
+
+@pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
+def test_price_parser_sorts_by_description(monkeypatch, tmp_path):
+    import pandas as pd
+    import sqlite3
+    import argparse
+    from smart_price import price_parser
+
+    sample_df = pd.DataFrame(
+        {
+            "Malzeme_Kodu": ["A", "B", "C", "D"],
+            "Açıklama": ["Vida", None, "Civata", "Vida"],
+            "Fiyat": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+    monkeypatch.setattr(price_parser, "extract_from_excel", lambda *_args, **_kw: sample_df.copy())
+    monkeypatch.setattr(pd.DataFrame, "to_excel", lambda *a, **k: None)
+
+    args = argparse.Namespace(
+        files=[str(tmp_path / "src.xlsx")],
+        output=str(tmp_path / "out.xlsx"),
+        db=str(tmp_path / "out.db"),
+        log=str(tmp_path / "out.csv"),
+        show_log=False,
+    )
+    monkeypatch.setattr(price_parser, "parse_args", lambda: args)
+
+    price_parser.main()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        rows = conn.execute("SELECT description, typeof(description) FROM prices").fetchall()
+    finally:
+        conn.close()
+    assert [r[0] for r in rows] == ["Civata", "Vida", "Vida", None]
+    assert rows[0][1] == "text"
+
+
+@pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
+def test_configure_poppler_runs_lookup_once(monkeypatch, tmp_path):
+    import os
+
+    calls: list[str] = []
+
+    def fake_which(name):
+        calls.append(name)
+        return None
+
+    monkeypatch.setattr(streamlit_app.shutil, "which", fake_which)
+    monkeypatch.setattr(streamlit_app.config, "POPPLER_PATH", tmp_path / "poppler")
+    monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+    streamlit_app._which.cache_clear()
+    try:
+        streamlit_app._configure_poppler()
+        streamlit_app._configure_poppler()
+    finally:
+        streamlit_app._which.cache_clear()
+
+    assert calls == ["pdftoppm"]
+    assert os.environ["PATH"].split(os.pathsep) == [str(tmp_path / "poppler"), str(tmp_path / "bin")]
+
+
+@pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
+def test_price_parser_replaces_existing_table(monkeypatch, tmp_path):
+    import pandas as pd
+    import sqlite3
+    import argparse
+    from smart_price import price_parser
+
+    db = tmp_path / "out.db"
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE prices (legacy TEXT)")
+        conn.execute("INSERT INTO prices VALUES ('stale')")
+    conn.close()
+
+    sample_df = pd.DataFrame({"Malzeme_Kodu": ["A1"], "Açıklama": ["Item"], "Fiyat": [10], "Sayfa": [2]})
+    monkeypatch.setattr(price_parser, "extract_from_excel", lambda *_args, **_kw: sample_df.copy())
+    monkeypatch.setattr(pd.DataFrame, "to_excel", lambda *a, **k: None)
+    args = argparse.Namespace(
+        files=[str(tmp_path / "src.xlsx")],
+        output=str(tmp_path / "out.xlsx"),
+        db=str(db),
+        log=str(tmp_path / "out.csv"),
+        show_log=False,
+    )
+    monkeypatch.setattr(price_parser, "parse_args", lambda: args)
+
+    price_parser.main()
+
+    conn = sqlite3.connect(db)
+    try:
+        types = {r[1]: r[2] for r in conn.execute("PRAGMA table_info(prices)")}
+        rows = conn.execute("SELECT material_code, price, source_page FROM prices").fetchall()
+    finally:
+        conn.close()
+    assert "legacy" not in types
+    assert types["price"] == "REAL"
+    assert rows == [("A1", 10.0, 2)]
+
+
+@pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
+def test_price_parser_spills_extracted_rows(monkeypatch, tmp_path):
+    pytest.importorskip("pyarrow")
+    import pandas as pd
+    import argparse
+    import os
+    import tempfile
+    from smart_price import price_parser
+
+    frames = iter([
+        pd.DataFrame({"Malzeme_Kodu": ["A1"], "Açıklama": ["B"], "Fiyat": [1.0]}),
+        pd.DataFrame({"Malzeme_Kodu": ["C3"], "Açıklama": ["A"], "Fiyat": [2.0], "Marka": ["X"]}),
+    ])
+    monkeypatch.setattr(price_parser, "extract_from_excel", lambda *_a, **_k: next(frames))
+    monkeypatch.setattr(os, "cpu_count", lambda: 1)
+    dirs: list[str] = []
+    real_mkdtemp = tempfile.mkdtemp
+
+    def tracking_mkdtemp(*a, **k):
+        dirs.append(real_mkdtemp(*a, **k))
+        return dirs[-1]
+
+    monkeypatch.setattr(price_parser.tempfile, "mkdtemp", tracking_mkdtemp)
+    read: list[str] = []
+    real_read = pd.read_parquet
+    monkeypatch.setattr(pd, "read_parquet", lambda p, **k: read.append(p) or real_read(p, **k))
+    written: list[pd.DataFrame] = []
+    monkeypatch.setattr(pd.DataFrame, "to_excel", lambda self, *a, **k: written.append(self.copy()))
+
+    args = argparse.Namespace(
+        files=[str(tmp_path / "a.xlsx"), str(tmp_path / "b.xlsx")],
+        output=str(tmp_path / "out.xlsx"),
+        db=str(tmp_path / "out.db"),
+        log=str(tmp_path / "out.csv"),
+        show_log=False,
+    )
+    monkeypatch.setattr(price_parser, "parse_args", lambda: args)
+
+    price_parser.main()
+
+    assert [os.path.basename(p) for p in read] == ["00000.parquet", "00001.parquet"]
+    assert not os.path.exists(dirs[0])
+    assert written[0]["Malzeme_Kodu"].tolist() == ["C3", "A1"]
+
+
+@pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
+def test_price_parser_pool_writes_token_log(monkeypatch, tmp_path):
+    import pandas as pd
+    import argparse
+    import os
+    from smart_price import price_parser
+    from smart_price.core import token_utils
+
+    def fake_extract(path, **_kw):
+        name = os.path.basename(path)
+        token_utils.log_token_counts(name, 1, 2)
+        return pd.DataFrame({"Malzeme_Kodu": [name], "Açıklama": [name], "Fiyat": [1.0]})
+
+    monkeypatch.setattr(price_parser, "extract_from_excel", fake_extract)
+    monkeypatch.setattr(price_parser.config, "LOG_PATH", tmp_path / "smart_price.log")
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(pd.DataFrame, "to_excel", lambda *a, **k: None)
+    token_utils._close_token_log()
+
+    args = argparse.Namespace(
+        files=[str(tmp_path / f"{n}.xlsx") for n in "abc"],
+        output=str(tmp_path / "out.xlsx"),
+        db=str(tmp_path / "out.db"),
+        log=str(tmp_path / "out.csv"),
+        show_log=False,
+    )
+    monkeypatch.setattr(price_parser, "parse_args", lambda: args)
+
+    price_parser.main()
+
+    lines = (tmp_path / "token_log.txt").read_text(encoding="utf-8").splitlines()
+    assert sorted(line.split("\t")[0] for line in lines) == ["a.xlsx", "b.xlsx", "c.xlsx"]
@@ -40,3 +40,22 @@ def test_synonym_block_in_prompt(monkeypatch):
     mod = importlib.reload(pb)
     prompt = mod.get_prompt_for_file("dummy.pdf")
     assert "accept any of these header texts" in prompt.lower()
+
+
+def test_prompt_cached_by_file_name():
+    pb._prompt_for_name.cache_clear()
+    first = pb.get_prompt_for_file("/tmp/a/MATRIX Fiyat Listesi.pdf")
+    second = pb.get_prompt_for_file("/var/b/MATRIX Fiyat Listesi.pdf")
+    assert first is second
+    assert pb._prompt_for_name.cache_info().hits == 1
+
+
+def test_brand_slugs_precomputed(monkeypatch):
+    g = pb._guide()
+    assert len(g.brand_slugs) == len(g.brand_blocks)
+    calls = []
+    orig = pb._slug
+    monkeypatch.setattr(pb, "_slug", lambda t: calls.append(t) or orig(t))
+    brand, _body = pb._match_brand("MATRIX Fiyat Listesi.pdf", g)
+    assert brand == "MATRIX"
+    assert calls == ["MATRIX Fiyat Listesi"]
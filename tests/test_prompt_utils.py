@@ -56,3 +56,38 @@ def test_prompts_append_json_hint(tmp_path):
     result = prompt_utils.prompts_for_pdf("dummy.pdf")
     assert isinstance(result, str)
 
+
+
+def test_load_extraction_guide_cached_until_modified(tmp_path, monkeypatch):
+    import os
+
+    path = tmp_path / "guide.md"
+    path.write_text("## BRAND\nFirst\n")
+    calls = []
+    orig = prompt_utils._parse_md_guide
+    monkeypatch.setattr(prompt_utils, "_parse_md_guide", lambda p: calls.append(p) or orig(p))
+    prompt_utils._load_guide_file.cache_clear()
+
+    assert prompt_utils.load_extraction_guide(str(path))[0]["prompt"] == "First"
+    assert prompt_utils.load_extraction_guide(str(path))[0]["prompt"] == "First"
+    assert len(calls) == 1
+
+    path.write_text("## BRAND\nSecond\n")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert prompt_utils.load_extraction_guide(str(path))[0]["prompt"] == "Second"
+    assert len(calls) == 2
+
+
+def test_load_extraction_guide_returns_copies(tmp_path):
+    path = tmp_path / "guide.csv"
+    path.write_text("pdf,page,prompt\ndummy.pdf,1,HELLO\n")
+    prompt_utils._load_guide_file.cache_clear()
+
+    first = prompt_utils.load_extraction_guide(str(path))
+    first[0]["prompt"] = "CHANGED"
+    first.append({"pdf": "extra.pdf"})
+
+    assert prompt_utils.load_extraction_guide(str(path)) == [
+        {"pdf": "dummy.pdf", "page": "1", "prompt": "HELLO"}
+    ]
@@ -36,6 +36,12 @@ else:
     streamlit_app = None
 
 
+@pytest.fixture(autouse=True)
+def _cache_dir(tmp_path, monkeypatch):
+    if HAS_PANDAS:
+        monkeypatch.setattr(streamlit_app.config, "CACHE_DIR", tmp_path / "cache")
+
+
 @pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
 def test_save_master_new(tmp_path, monkeypatch):
     pytest.importorskip("openpyxl")
@@ -117,3 +123,70 @@ def test_save_master_update(tmp_path, monkeypatch):
     assert len(result) == 2
     assert 'old.xlsx' not in result[result['Açıklama'] == 'Old']['Kaynak_Dosya'].values
     assert not old_dir.exists()
+
+
+@pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
+def test_save_master_keeps_declared_schema(tmp_path, monkeypatch):
+    pytest.importorskip("openpyxl")
+    import pandas as pd
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(streamlit_app.config, "MASTER_EXCEL_PATH", tmp_path / "master_dataset.xlsx")
+    monkeypatch.setattr(streamlit_app.config, "MASTER_DB_PATH", tmp_path / "master.db")
+    monkeypatch.setattr(streamlit_app, "upload_folder", lambda *_a, **_k: False)
+    df = pd.DataFrame({
+        'Malzeme_Kodu': ['A1', 'B2'],
+        'Açıklama': ['Item', None],
+        'Fiyat': [1.0, float('nan')],
+        'Sayfa': [3, 4],
+        'Yil': [2024, 2025],
+    })
+
+    streamlit_app.save_master_dataset(df, mode="Yeni fiyat listesi")
+
+    with sqlite3.connect(streamlit_app.config.MASTER_DB_PATH) as conn:
+        types = {r[1]: r[2] for r in conn.execute("PRAGMA table_info(prices)")}
+        rows = conn.execute(
+            "SELECT material_code, description, price, typeof(source_page), year FROM prices"
+        ).fetchall()
+        journal = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal == "wal"
+    assert types["price"] == "REAL"
+    assert types["source_page"] == "INTEGER"
+    assert rows == [("A1", "Item", 1.0, "integer", 2024), ("B2", None, None, "integer", 2025)]
+
+
+@pytest.mark.skipif(not HAS_PANDAS, reason="pandas not installed")
+def test_save_master_reads_parquet_copy(tmp_path, monkeypatch):
+    pytest.importorskip("openpyxl")
+    pytest.importorskip("pyarrow")
+    import os
+    import pandas as pd
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(streamlit_app.config, "MASTER_EXCEL_PATH", tmp_path / "master_dataset.xlsx")
+    monkeypatch.setattr(streamlit_app.config, "MASTER_DB_PATH", tmp_path / "master.db")
+    monkeypatch.setattr(streamlit_app, "upload_folder", lambda *_a, **_k: False)
+
+    def row(code):
+        return pd.DataFrame({'Malzeme_Kodu': [code], 'Açıklama': ['Item'], 'Fiyat': [1.0]})
+
+    streamlit_app.save_master_dataset(row('A1'))
+    parquet = streamlit_app._master_parquet_path()
+    assert parquet.exists()
+    assert parquet.is_relative_to(tmp_path / "cache")
+    assert not list(tmp_path.glob("*.parquet"))
+
+    def fail_read_excel(*_a, **_k):
+        raise AssertionError("excel should not be read")
+
+    with monkeypatch.context() as m:
+        m.setattr(pd, "read_excel", fail_read_excel)
+        excel_path, _, _ = streamlit_app.save_master_dataset(row('B2'))
+    assert pd.read_excel(excel_path)['Malzeme_Kodu'].tolist() == ['A1', 'B2']
+
+    # A master Excel newer than its parquet copy wins.
+    row('X9').to_excel(excel_path, index=False)
+    os.utime(parquet, (0, 0))
+    streamlit_app.save_master_dataset(row('C3'))
+    assert pd.read_parquet(parquet)['Malzeme_Kodu'].tolist() == ['X9', 'C3']
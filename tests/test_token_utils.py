@@ -0,0 +1,143 @@
+import types
+
+import smart_price.core.token_utils as tu
+
+
+def test_encoder_built_once_per_model(monkeypatch):
+    calls: list[str] = []
+
+    class Enc:
+        def encode(self, text):
+            return text.split()
+
+    def encoding_for_model(model):
+        calls.append(model)
+        return Enc()
+
+    monkeypatch.setattr(
+        tu,
+        "tiktoken",
+        types.SimpleNamespace(encoding_for_model=encoding_for_model, get_encoding=lambda _n: Enc()),
+    )
+    tu._ENC_POOL.clear()
+    try:
+        assert tu.num_tokens_from_text("a b c", "m") == 3
+        assert tu.num_tokens_from_text("a b", "m") == 2
+        tu.num_tokens_from_messages([{"role": "user", "content": "x"}], "m")
+        assert calls == ["m"]
+    finally:
+        tu._ENC_POOL.clear()
+
+
+def test_messages_encoded_in_one_batch(monkeypatch):
+    batches: list[tuple[list[str], int]] = []
+    singles: list[str] = []
+
+    class Enc:
+        def encode(self, text):
+            singles.append(text)
+            return text.split()
+
+        def encode_batch(self, texts, num_threads=1):
+            batches.append((list(texts), num_threads))
+            return [t.split() for t in texts]
+
+    monkeypatch.setattr(
+        tu,
+        "tiktoken",
+        types.SimpleNamespace(encoding_for_model=lambda _m: Enc(), get_encoding=lambda _n: Enc()),
+    )
+    monkeypatch.setattr(tu.os, "cpu_count", lambda: 4)
+    tu._ENC_POOL.clear()
+    try:
+        messages = [
+            {"role": "system", "content": "a b"},
+            {"role": "user", "name": "bob", "content": None},
+        ]
+        # 3 per message + 5 encoded tokens + 1 for the name + 3 priming
+        assert tu.num_tokens_from_messages(messages, "m") == 15
+        assert singles == ["system", "a b", "user", "bob"]
+        assert batches == []
+
+        many = [{"role": "user", "content": "x y"}] * tu._BATCH_MIN_STRINGS
+        expected = 3 * len(many) + 3 * len(many) + 3
+        assert tu.num_tokens_from_messages(many, "m") == expected
+        assert len(batches) == 1
+        assert len(batches[0][0]) == 2 * len(many)
+        assert batches[0][1] == 4
+    finally:
+        tu._ENC_POOL.clear()
+
+
+def test_token_log_reuses_handle(monkeypatch, tmp_path):
+    opened: list[str] = []
+    real_open = open
+
+    def tracking_open(path, *args, **kwargs):
+        opened.append(str(path))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(tu.config, "LOG_PATH", tmp_path / "smart_price.log")
+    monkeypatch.setattr("builtins.open", tracking_open)
+    log_file = tmp_path / "token_log.txt"
+    tu._close_token_log()
+    try:
+        tu.log_token_counts("a.pdf", 1, 2)
+        # Each entry is on disk before the handle is closed.
+        assert log_file.read_text(encoding="utf-8") == "a.pdf\tinput:1\toutput:2\ttotal:3\n"
+        tu.log_token_counts("b.pdf", 3, 4)
+    finally:
+        tu._close_token_log()
+
+    assert opened == [str(log_file)]
+    assert log_file.read_text(encoding="utf-8").splitlines() == [
+        "a.pdf\tinput:1\toutput:2\ttotal:3",
+        "b.pdf\tinput:3\toutput:4\ttotal:7",
+    ]
+
+
+def test_encoder_built_once_across_threads(monkeypatch):
+    import threading
+    import time
+
+    calls: list[str] = []
+
+    class Enc:
+        def encode(self, text):
+            return text.split()
+
+    def encoding_for_model(model):
+        calls.append(model)
+        time.sleep(0.01)
+        return Enc()
+
+    monkeypatch.setattr(
+        tu,
+        "tiktoken",
+        types.SimpleNamespace(encoding_for_model=encoding_for_model, get_encoding=lambda _n: Enc()),
+    )
+    tu._ENC_POOL.clear()
+    try:
+        threads = [threading.Thread(target=tu.num_tokens_from_text, args=("a", "m")) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert calls == ["m"]
+    finally:
+        tu._ENC_POOL.clear()
+
+
+def test_token_counts_reported_through_logger(monkeypatch, tmp_path, caplog, capsys):
+    import logging
+
+    monkeypatch.setattr(tu.config, "LOG_PATH", tmp_path / "smart_price.log")
+    tu._close_token_log()
+    try:
+        with caplog.at_level(logging.INFO, logger="smart_price"):
+            tu.log_token_counts("a.pdf", 1, 2)
+    finally:
+        tu._close_token_log()
+
+    assert "Token usage for a.pdf - input=1, output=2, total=3" in caplog.text
+    assert capsys.readouterr().out == ""